@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк публичных методов DatabaseManager и контроллеров на базах разного размера.
+
+Для каждого размера создаётся БД с заданным числом задач, после чего каждый метод
+вызывается до --repeat раз (но не дольше --budget секунд на метод). В отчёт попадают
+p50/p95/p99 задержки, строки в секунду и пик памяти по tracemalloc (отдельный прогон,
+чтобы трассировка не искажала время). Результаты пишутся в JSON; с --baseline они
+сравниваются с сохранёнными, и при росте p50 больше чем на --threshold скрипт
+завершается с кодом 1.
+
+По умолчанию берутся DEFAULT_SIZES (1 тыс. и 100 тыс. задач) - такой прогон укладывается
+в несколько минут. --full добавляет базу на 1 млн задач (FULL_SIZES): там видны планы
+запросов и рост памяти, которые на малых базах незаметны, но одно её заполнение занимает
+минуты, поэтому полный прогон лучше делать с --data-dir, чтобы БД создавалась один раз.
+
+Запуск: python -m benchmarks.bench_database --full --data-dir bench-data --output bench.json
+        python -m benchmarks.bench_database --baseline bench.json --threshold 0.2
+"""
+
+import argparse
+import gc
+import inspect
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from controllers.project_controller import ProjectController
+from controllers.task_controller import TaskController
+from controllers.user_controller import UserController
+from database.data_generator import generate_data
+from database.database_manager import DatabaseManager
+from database.instrumentation import count_rows as count_result_rows
+from models.project import Project
+from models.task import Task
+from models.user import User
+
+DEFAULT_SIZES = (1_000, 100_000)
+FULL_SIZES = DEFAULT_SIZES + (1_000_000,)
+DEFAULT_REPEAT = 20
+DEFAULT_BUDGET = 5.0
+DEFAULT_THRESHOLD = 0.2
+BULK_ROWS = 1_000
+
+# Задержки меньше этого порога (мс) при сравнении с базой считаются шумом
+NOISE_FLOOR_MS = 0.5
+
+# Методы, которые не измеряются: закрытие соединений ломает остальные замеры
+SKIPPED = {'DatabaseManager.close'}
+
+BENCH_CLASSES = (DatabaseManager, TaskController, ProjectController, UserController)
+
+
+# === Подготовка данных ===
+
+def seed_database(db_path: str, tasks: int, seed: int = 0):
+    """Заполняет БД задачами, а также пользователями и проектами для них."""
+    db = DatabaseManager(db_path, profile='bulk-load')
+    try:
+        generate_data(db, users=max(10, tasks // 100), projects=max(5, tasks // 1000),
+                      tasks=tasks, seed=seed)
+    finally:
+        db.close()
+
+
+def prepare_database(size: int, data_dir: str) -> str:
+    """Путь к БД нужного размера; готовый файл из data_dir используется повторно."""
+    path = os.path.join(data_dir, f"bench_{size}.db")
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        seed_database(path, size)
+        print(f"  БД на {size} задач создана за {time.perf_counter() - started:.1f} с")
+    return path
+
+
+def copy_database(db_path: str, directory: str) -> str:
+    target = os.path.join(directory, os.path.basename(db_path))
+    source = sqlite3.connect(db_path)
+    destination = sqlite3.connect(target)
+    try:
+        source.backup(destination)
+    finally:
+        source.close()
+        destination.close()
+    return target
+
+
+# === Сценарии ===
+
+class Case:
+    """Замер одного метода: setup() готовит аргументы, call(*args) измеряется.
+
+    rows(result) - число строк результата; по умолчанию берётся из count_rows.
+    """
+
+    def __init__(self, name: str, call, setup=None, rows=None):
+        self.name = name
+        self.call = call
+        self.setup = setup
+        self.rows = rows or count_rows
+
+
+def count_rows(result) -> int:
+    """Число строк в результате; итераторы вычитываются до конца (это часть замера)."""
+    if hasattr(result, '__next__'):
+        return sum(1 for _ in result)
+    return count_result_rows(result)
+
+
+class Fixture:
+    """БД с контроллерами и id существующих строк для аргументов методов."""
+
+    def __init__(self, db_path: str):
+        self.db = DatabaseManager(db_path)
+        self.tasks = TaskController(self.db)
+        self.projects = ProjectController(self.db)
+        self.users = UserController(self.db)
+        with self.db.get_connection() as conn:
+            self.task_id = conn.execute("SELECT MAX(id) / 2 FROM tasks").fetchone()[0] or 1
+            self.project_id = conn.execute("SELECT MIN(id) FROM projects").fetchone()[0]
+            self.user_id = conn.execute("SELECT MIN(id) FROM users").fetchone()[0]
+        self.task_ids = list(range(self.task_id, self.task_id + 100))
+        self.due = datetime(2025, 1, 1)
+        self._counter = 0
+
+    def unique(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}_{os.getpid()}_{self._counter}"
+
+    def new_task(self) -> Task:
+        return Task(self.unique("bench"), "", 2, self.due, self.project_id, self.user_id)
+
+    def new_user(self) -> User:
+        name = self.unique("bench")
+        return User(name, f"{name}@example.com", 'developer')
+
+    def new_project(self) -> Project:
+        return Project(self.unique("bench"), "", self.due, self.due + timedelta(days=30))
+
+    def close(self):
+        self.db.close()
+
+
+def load_tasks(db: DatabaseManager, tasks: list):
+    # bulk_load замеряется вместе с перестройкой индексов и поиска на выходе из блока
+    with db.bulk_load():
+        return db.add_tasks_bulk(tasks)
+
+
+def database_cases(fx: Fixture) -> list:
+    db = fx.db
+    return [
+        Case("get_connection", db.get_connection),
+        Case("get_performance_settings", db.get_performance_settings),
+        Case("cache_stats", db.cache_stats),
+        Case("init_database", db.init_database),
+        Case("create_tables", db.create_tables),
+        Case("create_user_table", db.create_user_table),
+        Case("create_project_table", db.create_project_table),
+        Case("create_task_table", db.create_task_table),
+        Case("create_task_indexes", db.create_task_indexes),
+        Case("create_task_search_index", db.create_task_search_index),
+        Case("create_change_log", db.create_change_log),
+        Case("get_user_by_id", lambda: db.get_user_by_id(fx.user_id)),
+        Case("get_project_by_id", lambda: db.get_project_by_id(fx.project_id)),
+        Case("get_task_by_id", lambda: db.get_task_by_id(fx.task_id)),
+        Case("get_users_by_ids", lambda: db.get_users_by_ids(range(fx.user_id, fx.user_id + 100))),
+        Case("get_projects_by_ids",
+             lambda: db.get_projects_by_ids(range(fx.project_id, fx.project_id + 100))),
+        Case("get_tasks_by_ids", lambda: db.get_tasks_by_ids(fx.task_ids)),
+        Case("get_all_users", db.get_all_users),
+        Case("get_all_projects", db.get_all_projects),
+        Case("get_all_tasks", db.get_all_tasks),
+        Case("get_users_page", db.get_users_page),
+        Case("get_projects_page", db.get_projects_page),
+        Case("get_tasks_page", lambda: db.get_tasks_page(50, None, 'due_date')),
+        Case("get_tasks_window", lambda: db.get_tasks_window(fx.task_id, 100, 'priority')),
+        Case("iter_users", db.iter_users),
+        Case("iter_projects", db.iter_projects),
+        Case("iter_tasks", db.iter_tasks),
+        Case("iter_tasks_by_project", lambda: db.iter_tasks_by_project(fx.project_id)),
+        Case("iter_tasks_by_user", lambda: db.iter_tasks_by_user(fx.user_id)),
+        Case("get_tasks_by_project", lambda: db.get_tasks_by_project(fx.project_id)),
+        Case("get_tasks_by_user", lambda: db.get_tasks_by_user(fx.user_id)),
+        Case("count_tasks", db.count_tasks),
+        Case("count_tasks_by_project", lambda: db.count_tasks_by_project(fx.project_id)),
+        Case("count_tasks_by_user", lambda: db.count_tasks_by_user(fx.user_id)),
+        Case("count_tasks_by_status", db.count_tasks_by_status),
+        Case("count_tasks_by_priority", db.count_tasks_by_priority),
+        Case("get_task_completion_stats", db.get_task_completion_stats),
+        Case("get_overdue_tasks", lambda: db.get_overdue_tasks(limit=1000)),
+        Case("get_task_frame", db.get_task_frame),
+        Case("get_task_stats_report",
+             lambda: db.get_task_stats_report(
+                 'project_id', range(fx.project_id, fx.project_id + 100))),
+        Case("build_search_query", lambda: db.build_search_query("fix bu")),
+        Case("can_narrow_search", lambda: db.can_narrow_search("fix", "fix bug")),
+        Case("search_tasks", lambda: db.search_tasks("fix bug", limit=100)),
+        Case("read_only_executor", lambda: db.read_only_executor().close()),
+        Case("last_change_seq", db.last_change_seq),
+        Case("changes_since", lambda: db.changes_since(max(0, db.last_change_seq() - 1000))),
+        Case("get_entity_changes",
+             lambda: db.get_entity_changes('tasks', max(0, db.last_change_seq() - 1000))),
+        Case("add_user", lambda: db.add_user(fx.new_user())),
+        Case("add_project", lambda: db.add_project(fx.new_project())),
+        Case("add_task", lambda: db.add_task(fx.new_task())),
+        Case("add_users_bulk", db.add_users_bulk,
+             lambda: ([fx.new_user() for _ in range(BULK_ROWS)],)),
+        Case("add_projects_bulk", db.add_projects_bulk,
+             lambda: ([fx.new_project() for _ in range(BULK_ROWS)],)),
+        Case("add_tasks_bulk", db.add_tasks_bulk,
+             lambda: ([fx.new_task() for _ in range(BULK_ROWS)],)),
+        Case("bulk_load", lambda tasks: load_tasks(db, tasks),
+             lambda: ([fx.new_task() for _ in range(BULK_ROWS)],)),
+        Case("update_user", lambda: db.update_user(fx.user_id, role='developer')),
+        Case("update_project", lambda: db.update_project(fx.project_id, status='active')),
+        Case("update_task", lambda: db.update_task(fx.task_id, priority=2)),
+        Case("update_tasks_by_ids", lambda: db.update_tasks_by_ids(fx.task_ids, priority=2),
+             rows=lambda updated: updated),
+        Case("update_tasks", lambda: db.update_tasks({'id': fx.task_ids}, {'priority': 2}),
+             rows=lambda updated: updated),
+        Case("delete_user", db.delete_user, lambda: (db.add_user(fx.new_user()),)),
+        Case("delete_project", db.delete_project, lambda: (db.add_project(fx.new_project()),)),
+        Case("delete_task", db.delete_task, lambda: (db.add_task(fx.new_task()),)),
+        # Меняют журнал изменений, поэтому идут последними
+        Case("compact_change_log", db.compact_change_log, rows=lambda removed: removed),
+        Case("truncate_change_log",
+             lambda: db.truncate_change_log(max(0, db.last_change_seq() - 1000)),
+             rows=lambda removed: removed),
+    ]
+
+
+def task_controller_cases(fx: Fixture) -> list:
+    tc = fx.tasks
+    return [
+        Case("get_task", lambda: tc.get_task(fx.task_id)),
+        Case("get_all_tasks", tc.get_all_tasks),
+        Case("get_tasks_page", tc.get_tasks_page),
+        Case("get_tasks_window", lambda: tc.get_tasks_window(fx.task_id, 100)),
+        Case("iter_tasks", tc.iter_tasks),
+        Case("iter_tasks_by_project", lambda: tc.iter_tasks_by_project(fx.project_id)),
+        Case("iter_tasks_by_user", lambda: tc.iter_tasks_by_user(fx.user_id)),
+        Case("get_tasks_by_project", lambda: tc.get_tasks_by_project(fx.project_id)),
+        Case("get_tasks_by_user", lambda: tc.get_tasks_by_user(fx.user_id, 'pending')),
+        Case("count_tasks", tc.count_tasks),
+        Case("count_tasks_by_project", lambda: tc.count_tasks_by_project(fx.project_id)),
+        Case("count_tasks_by_user", lambda: tc.count_tasks_by_user(fx.user_id)),
+        Case("count_tasks_by_status", lambda: tc.count_tasks_by_status(fx.project_id)),
+        Case("count_tasks_by_priority", lambda: tc.count_tasks_by_priority(fx.project_id)),
+        Case("get_overdue_tasks", lambda: tc.get_overdue_tasks(limit=1000)),
+        Case("get_task_frame", tc.get_task_frame),
+        Case("search_tasks", lambda: tc.search_tasks("review", limit=100)),
+        Case("live_search", lambda: tc.live_search("review")),
+        Case("last_change_seq", tc.last_change_seq),
+        Case("get_changes_since",
+             lambda: tc.get_changes_since(max(0, tc.last_change_seq() - 1000))),
+        Case("add_task", lambda: tc.add_task(fx.unique("bench"), "", 2, fx.due,
+                                             fx.project_id, fx.user_id)),
+        Case("add_tasks_bulk", tc.add_tasks_bulk,
+             lambda: ([dict(title=fx.unique("bench"), description="", priority=2, due_date=fx.due,
+                            project_id=fx.project_id, assignee_id=fx.user_id)
+                       for _ in range(BULK_ROWS)],)),
+        Case("update_task", lambda: tc.update_task(fx.task_id, priority=1)),
+        Case("update_task_status", lambda: tc.update_task_status(fx.task_id, 'in_progress')),
+        Case("update_task_status_many",
+             lambda: tc.update_task_status_many(fx.task_ids, 'in_progress'),
+             rows=lambda updated: updated),
+        Case("reassign_tasks", lambda: tc.reassign_tasks(fx.task_ids, fx.user_id),
+             rows=lambda updated: updated),
+        Case("update_tasks", lambda: tc.update_tasks({'id': fx.task_ids}, {'status': 'pending'}),
+             rows=lambda updated: updated),
+        Case("delete_task", tc.delete_task, lambda: (fx.db.add_task(fx.new_task()),)),
+    ]
+
+
+def project_controller_cases(fx: Fixture) -> list:
+    pc = fx.projects
+    return [
+        Case("get_project", lambda: pc.get_project(fx.project_id)),
+        Case("get_all_projects", pc.get_all_projects),
+        Case("get_projects_page", pc.get_projects_page),
+        Case("iter_projects", pc.iter_projects),
+        Case("get_project_progress", lambda: pc.get_project_progress(fx.project_id)),
+        Case("get_all_projects_with_progress", pc.get_all_projects_with_progress),
+        Case("get_projects_report", pc.get_projects_report),
+        Case("count_tasks_by_project", lambda: pc.count_tasks_by_project(fx.project_id)),
+        Case("count_tasks_by_status", lambda: pc.count_tasks_by_status(fx.project_id)),
+        Case("last_change_seq", pc.last_change_seq),
+        Case("get_changes_since",
+             lambda: pc.get_changes_since(max(0, pc.last_change_seq() - 1000))),
+        Case("add_project", lambda: pc.add_project(fx.unique("bench"), "", fx.due,
+                                                   fx.due + timedelta(days=30))),
+        Case("add_projects_bulk", pc.add_projects_bulk,
+             lambda: ([dict(name=fx.unique("bench"), description="", start_date=fx.due,
+                            end_date=fx.due + timedelta(days=30))
+                       for _ in range(BULK_ROWS)],)),
+        Case("update_project", lambda: pc.update_project(fx.project_id, status='active')),
+        Case("update_project_status",
+             lambda: pc.update_project_status(fx.project_id, 'active')),
+        Case("delete_project", pc.delete_project, lambda: (fx.db.add_project(fx.new_project()),)),
+    ]
+
+
+def user_controller_cases(fx: Fixture) -> list:
+    uc = fx.users
+    return [
+        Case("get_user", lambda: uc.get_user(fx.user_id)),
+        Case("get_all_users", uc.get_all_users),
+        Case("get_users_page", uc.get_users_page),
+        Case("iter_users", uc.iter_users),
+        Case("get_user_tasks", lambda: uc.get_user_tasks(fx.user_id)),
+        Case("count_tasks_by_user", lambda: uc.count_tasks_by_user(fx.user_id)),
+        Case("count_tasks_by_status", lambda: uc.count_tasks_by_status(fx.user_id)),
+        Case("get_workload_report", uc.get_workload_report),
+        Case("last_change_seq", uc.last_change_seq),
+        Case("get_changes_since",
+             lambda: uc.get_changes_since(max(0, uc.last_change_seq() - 1000))),
+        Case("add_user", lambda: uc.add_user(fx.unique("bench"), f"{fx.unique('bench')}@x.org",
+                                             'developer')),
+        Case("add_users_bulk", uc.add_users_bulk,
+             lambda: ([dict(username=name, email=f"{name}@example.com", role='developer')
+                       for name in (fx.unique("bench") for _ in range(BULK_ROWS))],)),
+        Case("update_user", lambda: uc.update_user(fx.user_id, role='developer')),
+        Case("delete_user", uc.delete_user, lambda: (fx.db.add_user(fx.new_user()),)),
+    ]
+
+
+def build_cases(fx: Fixture) -> list:
+    """Все сценарии с именами вида Класс.метод; изменяющие данные идут после чтения."""
+    cases = []
+    for cls, factory in ((TaskController, task_controller_cases),
+                         (ProjectController, project_controller_cases),
+                         (UserController, user_controller_cases),
+                         (DatabaseManager, database_cases)):
+        for case in factory(fx):
+            case.name = f"{cls.__name__}.{case.name}"
+            cases.append(case)
+    return cases
+
+
+def public_methods() -> set:
+    return {f"{cls.__name__}.{name}" for cls in BENCH_CLASSES
+            for name, _ in inspect.getmembers(cls, inspect.isfunction)
+            if not name.startswith('_')}
+
+
+def uncovered(names) -> list:
+    """Публичные методы без сценария - чтобы новые методы не выпадали из замеров."""
+    return sorted(public_methods() - set(names) - SKIPPED)
+
+
+# === Измерение ===
+
+def percentile(samples: list, q: float) -> float:
+    """Перцентиль q (0..100) по отсортированным замерам с линейной интерполяцией."""
+    if len(samples) == 1:
+        return samples[0]
+    position = (len(samples) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(samples) - 1)
+    return samples[lower] + (samples[upper] - samples[lower]) * (position - lower)
+
+
+def run_once(case: Case):
+    args = case.setup() if case.setup else ()
+    started = time.perf_counter()
+    rows = case.rows(case.call(*args))
+    return time.perf_counter() - started, rows
+
+
+def measure(case: Case, repeat: int, budget: float) -> dict:
+    """Повторяет вызов до repeat раз или пока не кончится budget секунд (минимум 3 раза)."""
+    gc.collect()
+    samples, rows = [], 0
+    deadline = time.perf_counter() + budget
+    while len(samples) < repeat and (len(samples) < 3 or time.perf_counter() < deadline):
+        elapsed, rows = run_once(case)
+        samples.append(elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run_once(case)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    p50 = percentile(samples, 50)
+    return {
+        'samples': len(samples),
+        'p50_ms': p50 * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'rows': rows,
+        'rows_per_sec': rows / p50 if p50 > 0 else 0.0,
+        'peak_kib': peak / 1024,
+    }
+
+
+def run_size(db_path: str, repeat: int, budget: float, only: str = None) -> dict:
+    fx = Fixture(db_path)
+    try:
+        results = {}
+        for case in build_cases(fx):
+            if only and only not in case.name:
+                continue
+            results[case.name] = stats = measure(case, repeat, budget)
+            print(f"  {case.name:<50}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}"
+                  f"{stats['p99_ms']:>10.3f}{stats['rows_per_sec']:>14.0f}"
+                  f"{stats['peak_kib']:>12.1f}")
+        return results
+    finally:
+        fx.close()
+
+
+# === Сравнение с базой ===
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Сценарии, у которых p50 вырос больше чем в 1 + threshold раз относительно baseline.
+
+    Сравниваются только размеры и сценарии, которые есть в обоих файлах.
+    """
+    regressions = []
+    for size, cases in results['results'].items():
+        base_cases = baseline['results'].get(size, {})
+        for name, stats in cases.items():
+            base = base_cases.get(name)
+            if base is None or stats['p50_ms'] < NOISE_FLOOR_MS:
+                continue
+            ratio = stats['p50_ms'] / max(base['p50_ms'], NOISE_FLOOR_MS)
+            if ratio > 1 + threshold:
+                regressions.append((size, name, base['p50_ms'], stats['p50_ms'], ratio))
+    return regressions
+
+
+def metadata(args) -> dict:
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'budget': args.budget,
+    }
+
+
+def run_sizes(args) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            print(f"\n{size} задач")
+            print(f"  {'Метод':<50}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}"
+                  f"{'строк/с':>14}{'пик, КиБ':>12}")
+            db_path = prepare_database(size, args.data_dir or tmp)
+            if args.data_dir:
+                # Замеры меняют данные, поэтому сохранённая БД копируется во временную
+                db_path = copy_database(db_path, tmp)
+            results[str(size)] = run_size(db_path, args.repeat, args.budget, args.only)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sizes = parser.add_mutually_exclusive_group()
+    sizes.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                       help="число задач в БД, например 1000 100000 1000000")
+    sizes.add_argument("--full", dest="sizes", action="store_const", const=list(FULL_SIZES),
+                       help="полный набор размеров, включая 1 млн задач")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET,
+                        help="предел времени на один метод, с")
+    parser.add_argument("--only", help="замерять только методы, в имени которых есть строка")
+    parser.add_argument("--data-dir", help="каталог для БД; готовые файлы используются повторно")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимый относительный рост p50, например 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    output = {'meta': metadata(args), 'results': run_sizes(args)}
+    if not args.only and output['results']:
+        output['not_covered'] = uncovered(next(iter(output['results'].values())))
+        if output['not_covered']:
+            print("Методы без сценария: " + ", ".join(output['not_covered']), file=sys.stderr)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты записаны в {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare(output, json.load(f), args.threshold)
+    for size, name, before, after, ratio in regressions:
+        print(f"РЕГРЕССИЯ [{size}] {name}: {before:.3f} -> {after:.3f} мс (x{ratio:.2f})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
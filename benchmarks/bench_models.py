@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Сравнение памяти и времени на строку: модели со __slots__ и ленивыми датами
+против прежних классов с __dict__ и разбором дат в маппере.
+
+Запуск: python -m benchmarks.bench_models --rows 100000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from models.task import Task
+
+
+class LegacyTask:
+    """Копия прежней модели Task: обычный класс с __dict__."""
+
+    def __init__(self, title, description, priority, due_date, project_id, assignee_id,
+                 task_id=None):
+        self.id = task_id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.status = 'pending'
+        self.due_date = due_date
+        self.project_id = project_id
+        self.assignee_id = assignee_id
+
+
+def make_rows(count):
+    start = datetime(2024, 1, 1)
+    return [
+        (i, f"Задача {i}", f"Описание {i}", i % 3 + 1, 'pending',
+         (start + timedelta(minutes=i)).isoformat(), i % 100, i % 1000)
+        for i in range(count)
+    ]
+
+
+def build_legacy(rows):
+    # Так строил объекты прежний маппер: datetime.fromisoformat для каждой строки
+    return [LegacyTask(r[1], r[2], r[3], datetime.fromisoformat(r[5]), r[6], r[7], r[0])
+            for r in rows]
+
+
+def build_slotted(rows):
+    return [Task(r[1], r[2], r[3], r[5], r[6], r[7], r[0]) for r in rows]
+
+
+def measure(build, rows):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    objects = build(rows)
+    elapsed = time.perf_counter() - started
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for obj in objects:
+        obj.due_date
+    access = time.perf_counter() - started
+    return memory / len(rows), elapsed / len(rows), access / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{'Модель':<10}{'байт/строка':>14}{'мкс/строка':>14}{'мкс due_date':>15}")
+    for name, build in (("legacy", build_legacy), ("slotted", build_slotted)):
+        memory, build_time, access_time = measure(build, rows)
+        print(f"{name:<10}{memory:>14.0f}{build_time * 1e6:>14.2f}{access_time * 1e6:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from controllers.task_controller import TaskController
+from controllers.project_controller import ProjectController
+from controllers.user_controller import UserController
+from database.async_database_manager import AsyncDatabaseManager, AsyncProxy
+
+
+class _AsyncController(AsyncProxy):
+    """Асинхронная обёртка контроллера: методы - корутины, iter_* - async-генераторы.
+
+    Вызовы выполняются в пуле потоков переданного AsyncDatabaseManager.
+    """
+
+    controller_class = None
+
+    def __init__(self, db_manager: AsyncDatabaseManager = None):
+        self.db = db_manager or AsyncDatabaseManager()
+        super().__init__(self.controller_class(self.db.db), self.db.runner)
+
+
+class AsyncTaskController(_AsyncController):
+    controller_class = TaskController
+
+
+class AsyncProjectController(_AsyncController):
+    controller_class = ProjectController
+
+
+class AsyncUserController(_AsyncController):
+    controller_class = UserController
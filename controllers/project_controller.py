@@ -12,12 +12,27 @@ class ProjectController:
         self.db.add_project(project)
         return project
 
+    def add_projects_bulk(self, projects, chunk_size: int = 1000):
+        """Добавляет проекты из итерируемого набора словарей с полями add_project.
+
+        Строка, из которой не получается модель, попадает в errors результата
+        под своим индексом и не прерывает вставку остальных.
+        """
+        return self.db.add_projects_bulk(projects, chunk_size,
+                                         build=lambda fields: Project(**fields))
+
     def get_project(self, project_id: int) -> Project:
         return self.db.get_project_by_id(project_id)
 
     def get_all_projects(self) -> list:
         return self.db.get_all_projects()
 
+    def get_projects_page(self, page_size: int = 50, cursor: str = None):
+        return self.db.get_projects_page(page_size, cursor)
+
+    def iter_projects(self, batch_size: int = 500):
+        return self.db.iter_projects(batch_size)
+
     def update_project(self, project_id: int, **kwargs):
         self.db.update_project(project_id, **kwargs)
 
@@ -35,4 +50,44 @@ class ProjectController:
         project = self.get_project(project_id)
         if not project:
             raise ValueError(f"Project with id {project_id} not found")
-        return project.get_progress()
\ No newline at end of file
+        return project.get_progress()
+
+    def count_tasks_by_project(self, project_id: int) -> int:
+        return self.db.count_tasks_by_project(project_id)
+
+    def count_tasks_by_status(self, project_id: int) -> dict:
+        return self.db.count_tasks_by_status(project_id=project_id)
+
+    def get_all_projects_with_progress(self, by: str = 'time') -> list:
+        """Возвращает [(проект, прогресс)] за один проход.
+
+        by='time' - доля прошедшего срока на один общий момент now,
+        by='tasks' - доля завершённых задач по данным GROUP BY в базе.
+        """
+        projects = self.get_all_projects()
+        if by == 'time':
+            now = datetime.now()
+            return [(project, project.get_progress(now)) for project in projects]
+        if by == 'tasks':
+            stats = self.db.get_task_completion_stats()
+            return [(project, self._task_progress(project, *stats.get(project.id, (0, 0))))
+                    for project in projects]
+        raise ValueError(f"Invalid progress mode: {by}. Must be one of {{'time', 'tasks'}}")
+
+    def get_projects_report(self, executor=None, now: datetime = None) -> dict:
+        """{id проекта: задачи по статусам, всего, просроченные}."""
+        project_ids = [project.id for project in self.get_all_projects()]
+        return self.db.get_task_stats_report('project_id', project_ids, executor, now)
+
+    @staticmethod
+    def _task_progress(project: Project, completed: int, total: int) -> float:
+        if total == 0:
+            return 100.0 if project.status == 'completed' else 0.0
+        return round(completed / total * 100, 2)
+
+    def get_changes_since(self, seq: int = 0, limit: int = 1000):
+        """Изменённые после seq проекты и id удалённых; новый seq - в результате."""
+        return self.db.get_entity_changes("projects", seq, limit)
+
+    def last_change_seq(self) -> int:
+        return self.db.last_change_seq()
@@ -1,3 +1,4 @@
+import threading
 from datetime import datetime
 from models.task import Task
 from database.database_manager import DatabaseManager
@@ -6,6 +7,10 @@ from database.database_manager import DatabaseManager
 class TaskController:
     def __init__(self, db_manager: DatabaseManager = None):
         self.db = db_manager or DatabaseManager()
+        # (запрос, id результатов, поколение search_cache) последнего live_search;
+        # live_search вызывается из фоновых потоков, поэтому доступ - под блокировкой
+        self._last_search = None
+        self._search_lock = threading.Lock()
 
     def add_task(self, title: str, description: str, priority: int,
                  due_date: datetime, project_id: int, assignee_id: int) -> Task:
@@ -13,34 +18,123 @@ class TaskController:
         self.db.add_task(task)
         return task
 
+    def add_tasks_bulk(self, tasks, chunk_size: int = 1000):
+        """Добавляет задачи из итерируемого набора словарей с полями add_task.
+
+        Строка, из которой не получается модель, попадает в errors результата
+        под своим индексом и не прерывает вставку остальных.
+        """
+        return self.db.add_tasks_bulk(tasks, chunk_size, build=lambda fields: Task(**fields))
+
     def get_task(self, task_id: int) -> Task:
         return self.db.get_task_by_id(task_id)
 
     def get_all_tasks(self) -> list:
         return self.db.get_all_tasks()
 
+    def get_tasks_page(self, page_size: int = 50, cursor: str = None, order_by: str = 'id'):
+        return self.db.get_tasks_page(page_size, cursor, order_by)
+
+    def get_tasks_window(self, offset: int, limit: int, order_by: str = 'id',
+                         descending: bool = False) -> list:
+        return self.db.get_tasks_window(offset, limit, order_by, descending)
+
+    def count_tasks(self) -> int:
+        return self.db.count_tasks()
+
+    def iter_tasks(self, batch_size: int = 500):
+        return self.db.iter_tasks(batch_size)
+
     def update_task(self, task_id: int, **kwargs):
         self.db.update_task(task_id, **kwargs)
 
     def delete_task(self, task_id: int):
         self.db.delete_task(task_id)
 
-    def search_tasks(self, query: str) -> list:
-        return self.db.search_tasks(query)
+    def search_tasks(self, query: str, limit: int = None) -> list:
+        return self.db.search_tasks(query, limit)
+
+    def live_search(self, query: str) -> list:
+        """Поиск для ввода с клавиатуры: повторные запросы берутся из кэша id.
+
+        Если запрос продолжает предыдущий ("bug" -> "bugs"), поиск идёт только среди
+        его результатов, а не по всей таблице.
+        """
+        cache = self.db.search_cache
+        generation = cache.generation
+        ids = cache.get(query)
+        if ids is not None:
+            tasks = self.db.get_tasks_by_ids(ids)
+        else:
+            within = None
+            with self._search_lock:
+                previous = self._last_search
+            if previous is not None and previous[2] == generation \
+                    and self.db.can_narrow_search(previous[0], query):
+                within = previous[1]
+            tasks = self.db.search_tasks(query, within=within)
+            ids = [task.id for task in tasks]
+            cache.put(query, ids, generation)
+        with self._search_lock:
+            self._last_search = (query, ids, generation)
+        return tasks
 
     def update_task_status(self, task_id: int, new_status: str):
-        task = self.get_task(task_id)
-        if not task:
+        Task.validate_status(new_status)
+        if not self.db.update_tasks_by_ids([task_id], status=new_status):
             raise ValueError(f"Task with id {task_id} not found")
-        task.update_status(new_status)
-        self.db.update_task(task_id, status=task.status)
 
-    def get_overdue_tasks(self) -> list:
-        tasks = self.get_all_tasks()
-        return [task for task in tasks if task.is_overdue()]
+    def update_task_status_many(self, task_ids, new_status: str) -> int:
+        """Переводит набор задач в new_status одной транзакцией."""
+        Task.validate_status(new_status)
+        return self.db.update_tasks_by_ids(task_ids, status=new_status)
+
+    def reassign_tasks(self, task_ids, assignee_id: int) -> int:
+        """Назначает набор задач на assignee_id одной транзакцией."""
+        if self.db.get_user_by_id(assignee_id) is None:
+            raise ValueError(f"User with id {assignee_id} not found")
+        return self.db.update_tasks_by_ids(task_ids, assignee_id=assignee_id)
+
+    def update_tasks(self, where: dict, set: dict) -> int:
+        if 'status' in set:
+            Task.validate_status(set['status'])
+        return self.db.update_tasks(where, set)
+
+    def get_overdue_tasks(self, project_id: int = None, assignee_id: int = None,
+                          limit: int = None) -> list:
+        return self.db.get_overdue_tasks(project_id=project_id, assignee_id=assignee_id,
+                                         limit=limit)
 
     def get_tasks_by_project(self, project_id: int) -> list:
         return self.db.get_tasks_by_project(project_id)
 
-    def get_tasks_by_user(self, user_id: int) -> list:
-        return self.db.get_tasks_by_user(user_id)
\ No newline at end of file
+    def get_tasks_by_user(self, user_id: int, status: str = None) -> list:
+        return self.db.get_tasks_by_user(user_id, status)
+
+    def iter_tasks_by_project(self, project_id: int, batch_size: int = 500):
+        return self.db.iter_tasks_by_project(project_id, batch_size)
+
+    def iter_tasks_by_user(self, user_id: int, batch_size: int = 500):
+        return self.db.iter_tasks_by_user(user_id, batch_size)
+
+    def count_tasks_by_user(self, user_id: int) -> int:
+        return self.db.count_tasks_by_user(user_id)
+
+    def count_tasks_by_project(self, project_id: int) -> int:
+        return self.db.count_tasks_by_project(project_id)
+
+    def count_tasks_by_status(self, project_id: int = None, assignee_id: int = None) -> dict:
+        return self.db.count_tasks_by_status(project_id, assignee_id)
+
+    def count_tasks_by_priority(self, project_id: int = None, assignee_id: int = None) -> dict:
+        return self.db.count_tasks_by_priority(project_id, assignee_id)
+
+    def get_task_frame(self, use_numpy: bool = None):
+        return self.db.get_task_frame(use_numpy=use_numpy)
+
+    def get_changes_since(self, seq: int = 0, limit: int = 1000):
+        """Изменённые после seq задачи и id удалённых; новый seq - в результате."""
+        return self.db.get_entity_changes("tasks", seq, limit)
+
+    def last_change_seq(self) -> int:
+        return self.db.last_change_seq()
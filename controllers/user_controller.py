@@ -11,12 +11,26 @@ class UserController:
         self.db.add_user(user)
         return user
 
+    def add_users_bulk(self, users, chunk_size: int = 1000):
+        """Добавляет пользователей из итерируемого набора словарей с полями add_user.
+
+        Строка, из которой не получается модель, попадает в errors результата
+        под своим индексом и не прерывает вставку остальных.
+        """
+        return self.db.add_users_bulk(users, chunk_size, build=lambda fields: User(**fields))
+
     def get_user(self, user_id: int) -> User:
         return self.db.get_user_by_id(user_id)
 
     def get_all_users(self) -> list:
         return self.db.get_all_users()
 
+    def get_users_page(self, page_size: int = 50, cursor: str = None):
+        return self.db.get_users_page(page_size, cursor)
+
+    def iter_users(self, batch_size: int = 500):
+        return self.db.iter_users(batch_size)
+
     def update_user(self, user_id: int, **kwargs):
         self.db.update_user(user_id, **kwargs)
 
@@ -28,4 +42,22 @@ class UserController:
         user = self.get_user(user_id)
         if not user:
             raise ValueError(f"User with id {user_id} not found")
-        return self.db.get_tasks_by_user(user_id)
\ No newline at end of file
+        return self.db.get_tasks_by_user(user_id)
+
+    def count_tasks_by_user(self, user_id: int) -> int:
+        return self.db.count_tasks_by_user(user_id)
+
+    def count_tasks_by_status(self, user_id: int) -> dict:
+        return self.db.count_tasks_by_status(assignee_id=user_id)
+
+    def get_workload_report(self, executor=None, now=None) -> dict:
+        """{id пользователя: задачи по статусам, всего, просроченные}."""
+        user_ids = [user.id for user in self.get_all_users()]
+        return self.db.get_task_stats_report('assignee_id', user_ids, executor, now)
+
+    def get_changes_since(self, seq: int = 0, limit: int = 1000):
+        """Изменённые после seq пользователи и id удалённых; новый seq - в результате."""
+        return self.db.get_entity_changes("users", seq, limit)
+
+    def last_change_seq(self) -> int:
+        return self.db.last_change_seq()
@@ -0,0 +1,183 @@
+import asyncio
+import functools
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from database.database_manager import DatabaseManager, DEFAULT_BATCH_SIZE
+
+# Методы с этим префиксом возвращают синхронные генераторы и оборачиваются в async-генераторы
+STREAMING_PREFIX = 'iter_'
+# Методы, возвращающие синхронный контекстный менеджер; отдаются как async with
+CONTEXT_MANAGERS = {'bulk_load'}
+
+
+class AsyncRunner:
+    """Выполняет вызовы DatabaseManager в отдельном ограниченном пуле потоков.
+
+    Каждый поток пула работает через собственное соединение из ConnectionPool.
+    Если ожидающую корутину отменяют, пока запрос выполняется, соединению этого
+    потока отправляется interrupt(), и SQLite прерывает текущий запрос.
+    """
+
+    def __init__(self, db: DatabaseManager, max_workers: int = 4):
+        self.db = db
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="async-db")
+        self._lock = threading.Lock()
+        self._running = {}  # номер вызова -> соединение потока, который его выполняет
+        self._cancelled = set()
+        self._counter = itertools.count()
+
+    async def run(self, func, *args, **kwargs):
+        call_id = next(self._counter)
+        future = self._executor.submit(self._call, call_id, func, args, kwargs)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            self._cancel(call_id, future)
+            raise
+
+    def _call(self, call_id: int, func, args, kwargs):
+        conn = self.db.get_connection()
+        with self._lock:
+            if call_id in self._cancelled:
+                self._cancelled.discard(call_id)
+                raise asyncio.CancelledError()
+            self._running[call_id] = conn
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running.pop(call_id, None)
+                self._cancelled.discard(call_id)
+
+    def _cancel(self, call_id: int, future):
+        if future.cancel():
+            # Вызов ещё стоял в очереди пула и уже не начнётся
+            return
+        with self._lock:
+            conn = self._running.get(call_id)
+            if conn is not None:
+                # Под блокировкой: поток не успеет снять запись и начать следующий вызов
+                conn.interrupt()
+            elif not future.done():
+                # Поток уже взял вызов, но ещё не начал запрос (или только что его закончил);
+                # после завершения future отметка больше не нужна
+                self._cancelled.add(call_id)
+                future.add_done_callback(lambda _: self._forget_cancelled(call_id))
+
+    def _forget_cancelled(self, call_id: int):
+        with self._lock:
+            self._cancelled.discard(call_id)
+
+    async def stream(self, iterator, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Async-генератор поверх синхронного итератора: порции забираются в пуле потоков."""
+        try:
+            while True:
+                batch = await self.run(lambda: list(itertools.islice(iterator, batch_size)))
+                if not batch:
+                    break
+                for item in batch:
+                    yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                # Закрываем генератор, чтобы выполнились его finally (например, учёт вызова
+                # в QueryInstrumentation)
+                try:
+                    await self.run(close)
+                except ValueError:
+                    pass  # отменённая порция ещё выполняется; генератор закроется сам
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class AsyncProxy:
+    """Отдаёт методы обёрнутого объекта как корутины, iter_* - как async-генераторы,
+    а методы из CONTEXT_MANAGERS - как асинхронные контекстные менеджеры."""
+
+    def __init__(self, target, runner: AsyncRunner):
+        self._target = target
+        self._runner = runner
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+        if name.startswith(STREAMING_PREFIX):
+            wrapper = _streaming_method(attribute, self._runner)
+        elif name in CONTEXT_MANAGERS:
+            wrapper = _context_method(attribute, self)
+        else:
+            wrapper = _async_method(attribute, self._runner)
+        # Кэшируем обёртку, чтобы __getattr__ не вызывался повторно
+        self.__dict__[name] = wrapper
+        return wrapper
+
+
+def _async_method(method, runner: AsyncRunner):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        return await runner.run(method, *args, **kwargs)
+    return wrapper
+
+
+def _streaming_method(method, runner: AsyncRunner):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        iterator = await runner.run(method, *args, **kwargs)
+        async for item in runner.stream(iterator):
+            yield item
+    return wrapper
+
+
+def _context_method(method, proxy: AsyncProxy):
+    runner = proxy._runner
+
+    @functools.wraps(method)
+    @asynccontextmanager
+    async def wrapper(*args, **kwargs):
+        manager = method(*args, **kwargs)
+        value = await runner.run(manager.__enter__)
+        try:
+            yield proxy if value is proxy._target else value
+        except BaseException as e:
+            if not await runner.run(manager.__exit__, type(e), e, e.__traceback__):
+                raise
+        else:
+            await runner.run(manager.__exit__, None, None, None)
+    return wrapper
+
+
+class AsyncDatabaseManager(AsyncProxy):
+    """Асинхронный интерфейс к DatabaseManager для asyncio-приложений.
+
+    Все методы DatabaseManager доступны как awaitable с теми же аргументами,
+    iter_* возвращают async-генераторы, bulk_load используется как async with.
+    Запросы выполняются в собственном пуле из max_workers потоков, поэтому цикл
+    событий не блокируется.
+    """
+
+    def __init__(self, db_path: str = "tasks.db", max_workers: int = 4, **kwargs):
+        kwargs.setdefault('pool_size', max_workers)
+        self.db = DatabaseManager(db_path, **kwargs)
+        super().__init__(self.db, AsyncRunner(self.db, max_workers))
+
+    @property
+    def runner(self) -> AsyncRunner:
+        return self._runner
+
+    async def close(self):
+        # Сначала дожидаемся уже запущенных запросов, потом закрываем соединения
+        await asyncio.to_thread(self._runner.shutdown)
+        self.db.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
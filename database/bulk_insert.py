@@ -0,0 +1,146 @@
+import sqlite3
+from contextlib import contextmanager
+from itertools import islice
+
+
+class BulkInsertResult:
+    """Итог пакетной вставки: id в порядке входных строк (None для неудачных) и ошибки."""
+
+    def __init__(self):
+        self.ids = []
+        self.errors = []  # [(индекс строки, сообщение)]
+
+    @property
+    def inserted(self) -> int:
+        return len(self.ids) - len(self.errors)
+
+    def __repr__(self):
+        return f"BulkInsertResult(inserted={self.inserted}, failed={len(self.errors)})"
+
+
+def bulk_insert(conn: sqlite3.Connection, table: str, columns: tuple, items, to_params,
+                chunk_size: int = 1000, on_inserted=None, build=None) -> BulkInsertResult:
+    """Вставляет items порциями по chunk_size, каждая порция - одна транзакция с executemany.
+
+    Если у conn уже открыта транзакция, порции вставляются внутри неё и фиксируются
+    вместе с ней.
+
+    build(item), если задан, строит из элемента объект (например, модель из словаря
+    полей), to_params(объект) возвращает кортеж значений для columns, on_inserted(объект, id)
+    вызывается для каждой успешно вставленной строки. Ошибки build и to_params
+    записываются для своей строки и не прерывают вставку. Если порция не проходит
+    целиком, она повторяется построчно, чтобы вставить корректные строки и
+    записать ошибки остальных.
+    """
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    result = BulkInsertResult()
+    iterator = iter(items)
+    offset = 0
+
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        rows = _prepare_rows(chunk, offset, to_params, build, result)
+        chunk_ids = _insert_chunk(conn, table, sql, rows, result)
+        result.ids.extend(chunk_ids.get(index) for index in range(offset, offset + len(chunk)))
+        if on_inserted is not None:
+            _notify_inserted(rows, chunk_ids, on_inserted)
+        offset += len(chunk)
+
+    result.errors.sort()
+    return result
+
+
+def _prepare_rows(chunk: list, offset: int, to_params, build, result: BulkInsertResult) -> list:
+    """[(индекс, объект, значения)] для строк порции; строки с ошибками попадают в result."""
+    rows = []
+    for index, item in enumerate(chunk, start=offset):
+        try:
+            if build is not None:
+                item = build(item)
+            rows.append((index, item, to_params(item)))
+        except (AttributeError, TypeError, ValueError) as e:
+            result.errors.append((index, str(e)))
+    return rows
+
+
+def _notify_inserted(rows: list, chunk_ids: dict, on_inserted):
+    for index, item, _ in rows:
+        row_id = chunk_ids.get(index)
+        if row_id is not None:
+            on_inserted(item, row_id)
+
+
+def _next_rowid(conn: sqlite3.Connection, table: str) -> int:
+    # Для AUTOINCREMENT новый id = max(sqlite_sequence.seq, MAX(id)) + 1
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    max_id = conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0]
+    return max(seq[0] if seq else 0, max_id or 0) + 1
+
+
+def _insert_chunk(conn: sqlite3.Connection, table: str, sql: str, rows: list,
+                  result: BulkInsertResult) -> dict:
+    """Вставляет порцию одной транзакцией; возвращает {индекс строки: id}."""
+    if not rows:
+        return {}
+
+    with _chunk_transaction(conn):
+        ids = _insert_whole_chunk(conn, table, sql, rows)
+        if ids is None:
+            ids = _insert_row_by_row(conn, sql, rows, result)
+    return ids
+
+
+@contextmanager
+def _chunk_transaction(conn: sqlite3.Connection):
+    """Своя транзакция для порции или, если вызывающий уже открыл транзакцию, точка сохранения.
+
+    Во втором случае фиксирует вставку вызывающий: при ошибке откатывается только порция.
+    """
+    if conn.in_transaction:
+        conn.execute("SAVEPOINT bulk_insert")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK TO bulk_insert")
+            raise
+        finally:
+            conn.execute("RELEASE bulk_insert")
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _insert_whole_chunk(conn: sqlite3.Connection, table: str, sql: str, rows: list):
+    """Вставляет порцию одним executemany; None, если она не прошла и откачена."""
+    start = _next_rowid(conn, table)
+    conn.execute("SAVEPOINT bulk_chunk")
+    try:
+        conn.executemany(sql, [values for _, _, values in rows])
+        # Пока транзакция держит блокировку записи, id выдаются подряд; проверяем это
+        if _next_rowid(conn, table) != start + len(rows):
+            raise sqlite3.DatabaseError("Non-sequential ids in bulk insert")
+        conn.execute("RELEASE bulk_chunk")
+    except sqlite3.DatabaseError:
+        conn.execute("ROLLBACK TO bulk_chunk")
+        conn.execute("RELEASE bulk_chunk")
+        return None
+    return {index: start + i for i, (index, _, _) in enumerate(rows)}
+
+
+def _insert_row_by_row(conn: sqlite3.Connection, sql: str, rows: list,
+                       result: BulkInsertResult) -> dict:
+    """Повтор порции по одной строке: корректные вставляются, ошибки остальных - в result."""
+    ids = {}
+    for index, _, values in rows:
+        try:
+            ids[index] = conn.execute(sql, values).lastrowid
+        except sqlite3.DatabaseError as e:
+            result.errors.append((index, str(e)))
+    return ids
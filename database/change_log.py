@@ -0,0 +1,144 @@
+import sqlite3
+from collections import namedtuple
+
+# Таблицы, изменения которых пишутся в журнал; имя таблицы и есть entity в журнале
+CHANGE_LOG_TABLES = ('users', 'projects', 'tasks')
+CHANGE_OPS = ('insert', 'update', 'delete')
+
+Change = namedtuple('Change', 'seq entity entity_id op changed_at')
+_CHANGE_SELECT = ", ".join(Change._fields)
+
+
+class ChangeLogTruncated(ValueError):
+    """Нужные изменения уже удалены из журнала: клиенту следует перечитать данные целиком."""
+
+    def __init__(self, seq: int, floor: int):
+        super().__init__(f"Changes after seq {seq} were truncated; oldest available is {floor}")
+        self.seq = seq
+        self.floor = floor
+
+
+class EntityChanges:
+    """Изменения одной сущности после seq: изменённые объекты, id удалённых и новый seq."""
+
+    def __init__(self, changed: list, deleted: list, seq: int, has_more: bool = False):
+        self.changed = changed
+        self.deleted = deleted
+        self.seq = seq
+        self.has_more = has_more
+
+    def __repr__(self):
+        return (f"EntityChanges(changed={len(self.changed)}, deleted={len(self.deleted)}, "
+                f"seq={self.seq}, has_more={self.has_more})")
+
+
+def create_change_log(conn: sqlite3.Connection):
+    """Создаёт журнал изменений и триггеры, которые дописывают в него строку на каждую запись."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity TEXT NOT NULL,
+            entity_id INTEGER NOT NULL,
+            op TEXT NOT NULL CHECK(op IN ('insert', 'update', 'delete')),
+            changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+        );
+        CREATE INDEX IF NOT EXISTS idx_change_log_entity ON change_log(entity, seq);
+        -- Журнал уже удалён до этого seq (не включительно), см. truncate_change_log
+        CREATE TABLE IF NOT EXISTS change_log_state (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            truncated_before INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO change_log_state (id, truncated_before) VALUES (1, 0);
+    """)
+    for table in CHANGE_LOG_TABLES:
+        for op, row in (('insert', 'new'), ('update', 'new'), ('delete', 'old')):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_log_{op} AFTER {op.upper()} ON {table} BEGIN
+                    INSERT INTO change_log (entity, entity_id, op)
+                    VALUES ('{table}', {row}.id, '{op}');
+                END
+            """)
+
+
+def has_change_log_triggers(conn: sqlite3.Connection) -> bool:
+    """Установлены ли в БД триггеры журнала (их могли поставить и другие экземпляры)."""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                       (f"{CHANGE_LOG_TABLES[0]}_log_insert",)).fetchone()
+    return row is not None
+
+
+def drop_change_log_triggers(conn: sqlite3.Connection):
+    for table in CHANGE_LOG_TABLES:
+        for op in CHANGE_OPS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {table}_log_{op}")
+
+
+def log_inserted(conn: sqlite3.Connection, table: str, after_id: int) -> int:
+    """Пишет в журнал вставку строк table с id больше after_id одним запросом.
+
+    Нужен после загрузки со снятыми триггерами (DatabaseManager.bulk_load). Время
+    записи вычисляется один раз, а не для каждой строки, как в триггере.
+    """
+    changed_at = conn.execute("SELECT strftime('%Y-%m-%dT%H:%M:%f', 'now')").fetchone()[0]
+    cursor = conn.execute(
+        f"INSERT INTO change_log (entity, entity_id, op, changed_at) "
+        f"SELECT '{table}', id, 'insert', ? FROM {table} WHERE id > ? ORDER BY id",
+        (changed_at, after_id))
+    return cursor.rowcount
+
+
+def last_seq(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    return row[0] if row else 0
+
+
+def changes_since(conn: sqlite3.Connection, seq: int, limit: int, entity: str = None) -> list:
+    """Записи журнала с номером больше seq по возрастанию, не больше limit штук."""
+    floor = conn.execute("SELECT truncated_before FROM change_log_state").fetchone()[0]
+    if seq + 1 < floor:
+        raise ChangeLogTruncated(seq, floor)
+    if entity is None:
+        rows = conn.execute(
+            f"SELECT {_CHANGE_SELECT} FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?",
+            (seq, limit)).fetchall()
+    else:
+        rows = conn.execute(
+            f"SELECT {_CHANGE_SELECT} FROM change_log "
+            "WHERE entity = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (entity, seq, limit)).fetchall()
+    return [Change(*row) for row in rows]
+
+
+def compact_change_log(conn: sqlite3.Connection, upto_seq: int = None) -> int:
+    """Оставляет по одной (последней) записи на сущность среди записей с seq <= upto_seq.
+
+    Клиент, читающий журнал с любого места, по-прежнему узнаёт обо всех изменённых
+    объектах, теряются только промежуточные операции. Возвращает число удалённых записей.
+    """
+    if upto_seq is None:
+        upto_seq = last_seq(conn)
+    cursor = conn.execute("""
+        DELETE FROM change_log WHERE seq <= ? AND seq NOT IN (
+            SELECT MAX(seq) FROM change_log WHERE seq <= ? GROUP BY entity, entity_id
+        )
+    """, (upto_seq, upto_seq))
+    return cursor.rowcount
+
+
+def truncate_change_log(conn: sqlite3.Connection, before_seq: int) -> int:
+    """Удаляет записи с seq < before_seq; клиенты с более старым seq получат ChangeLogTruncated."""
+    cursor = conn.execute("DELETE FROM change_log WHERE seq < ?", (before_seq,))
+    conn.execute("UPDATE change_log_state SET truncated_before = MAX(truncated_before, ?)",
+                 (before_seq,))
+    return cursor.rowcount
+
+
+def split_changes(changes: list):
+    """Разбивает записи журнала на id изменённых и удалённых сущностей по последней операции."""
+    latest = {}
+    for change in changes:
+        latest.pop(change.entity_id, None)
+        latest[change.entity_id] = change.op
+    changed = [entity_id for entity_id, op in latest.items() if op != 'delete']
+    deleted = [entity_id for entity_id, op in latest.items() if op == 'delete']
+    return changed, deleted
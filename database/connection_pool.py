@@ -0,0 +1,235 @@
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """Пул соединений SQLite: постоянное соединение на поток + ограниченный общий пул.
+
+    max_size ограничивает только общий пул (acquire/connection). Постоянные соединения
+    потоков создаются по одному на поток и в этот лимит не входят.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 5, timeout: float = 5.0,
+                 health_check_interval: float = 30.0, on_connect=None):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.on_connect = on_connect
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread_connections = {}  # ident потока -> соединение
+        self._idle = queue.LifoQueue()
+        self._shared_count = 0
+        self._checked_out = set()
+        self._last_used = {}  # соединение -> время последнего использования
+        self._closed = False
+
+    # === Создание и проверка соединений ===
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        if self.on_connect is not None:
+            self.on_connect(conn)
+        self._touch(conn)
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Проверяет соединение, если оно давно не использовалось."""
+        last_used = self._last_used.get(conn, 0.0)
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection):
+        self._last_used.pop(conn, None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _touch(self, conn: sqlite3.Connection):
+        self._last_used[conn] = time.monotonic()
+
+    def _check_open(self):
+        """Бросает ProgrammingError, если пул закрыт; соединение потока при этом закрывается."""
+        if not self._closed:
+            return
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._forget_thread_connection(conn)
+        raise sqlite3.ProgrammingError("Cannot operate on a closed connection pool")
+
+    # === Соединение текущего потока ===
+
+    def get_thread_connection(self) -> sqlite3.Connection:
+        """Возвращает постоянное соединение, закреплённое за текущим потоком."""
+        self._check_open()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            if self._is_healthy(conn):
+                self._touch(conn)
+                return conn
+            self._forget_thread_connection(conn)
+
+        conn = self._connect()
+        self._local.conn = conn
+        with self._lock:
+            dead = self._pop_dead_thread_connections()
+            self._thread_connections[threading.get_ident()] = conn
+        for stale in dead:
+            self._discard(stale)
+        return conn
+
+    def _pop_dead_thread_connections(self) -> list:
+        """Забирает соединения завершившихся потоков (вызывать под self._lock)."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        dead = [ident for ident in self._thread_connections if ident not in alive]
+        return [self._thread_connections.pop(ident) for ident in dead]
+
+    def _forget_thread_connection(self, conn: sqlite3.Connection):
+        with self._lock:
+            ident = threading.get_ident()
+            if self._thread_connections.get(ident) is conn:
+                del self._thread_connections[ident]
+        self._local.conn = None
+        self._discard(conn)
+
+    # === Общий ограниченный пул ===
+
+    def acquire(self, timeout: float = None) -> sqlite3.Connection:
+        """Выдаёт соединение из общего пула; ждёт, если все max_size соединений заняты."""
+        self._check_open()
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        conn = None
+        while conn is None:
+            conn = self._take_idle(block=False) or self._create_shared()
+            if conn is None:
+                conn = self._take_idle(block=True, timeout=max(deadline - time.monotonic(), 0))
+                if conn is None:
+                    raise TimeoutError(f"No free connection in pool after {timeout} s")
+            conn = self._reap_if_dead(conn)
+
+        with self._lock:
+            self._checked_out.add(conn)
+        self._touch(conn)
+        return conn
+
+    def _create_shared(self):
+        """Открывает новое соединение общего пула, если лимит max_size не исчерпан."""
+        with self._lock:
+            if self._shared_count >= self.max_size:
+                return None
+            self._shared_count += 1
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._shared_count -= 1
+            raise
+
+    def _reap_if_dead(self, conn: sqlite3.Connection):
+        """Возвращает conn, если оно живо; иначе закрывает его и освобождает место в пуле."""
+        if self._is_healthy(conn):
+            return conn
+        with self._lock:
+            self._shared_count -= 1
+        self._discard(conn)
+        return None
+
+    def _take_idle(self, block: bool, timeout: float = None):
+        try:
+            return self._idle.get(block=block, timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, conn: sqlite3.Connection):
+        """Возвращает соединение в общий пул."""
+        with self._lock:
+            if conn not in self._checked_out:
+                raise ValueError("Connection does not belong to this pool")
+
+        if conn.in_transaction:
+            conn.rollback()
+        self._touch(conn)
+        # Под блокировкой, чтобы close() не пропустил соединение, вернувшееся во время закрытия
+        with self._lock:
+            self._checked_out.discard(conn)
+            stale = self._closed
+            if stale:
+                self._shared_count -= 1
+            else:
+                self._idle.put(conn)
+        if stale:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        """Берёт соединение из общего пула на время блока with и фиксирует транзакцию."""
+        conn = self.acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.release(conn)
+
+    # === Жизненный цикл ===
+
+    def close(self):
+        """Закрывает пул; после этого get_thread_connection и acquire бросают ProgrammingError.
+
+        Сразу закрываются соединение текущего потока, соединения завершившихся потоков
+        и свободные соединения общего пула. Соединения, которыми сейчас пользуются другие
+        потоки, не трогаются: выданные из общего пула закрываются в release(), постоянные -
+        при следующем обращении потока к пулу или вместе с потоком.
+        """
+        with self._lock:
+            self._closed = True
+            dead = self._pop_dead_thread_connections()
+            in_use = list(self._thread_connections.values())
+            self._thread_connections.clear()
+
+        own = getattr(self._local, "conn", None)
+        for conn in in_use:
+            if conn is not own:
+                self._last_used.pop(conn, None)
+        if own is not None:
+            self._forget_thread_connection(own)
+        for conn in dead:
+            self._discard(conn)
+        self._close_idle()
+
+    def _close_idle(self):
+        while True:
+            conn = self._take_idle(block=False)
+            if conn is None:
+                return
+            with self._lock:
+                self._shared_count -= 1
+            self._discard(conn)
+
+    def connections(self) -> list:
+        """Все открытые соединения пула: потоковые, свободные и выданные из общего пула."""
+        with self._lock:
+            return (list(self._thread_connections.values()) + list(self._idle.queue)
+                    + list(self._checked_out))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'thread_connections': len(self._thread_connections),
+                'shared_connections': self._shared_count,
+                'shared_idle': self._idle.qsize(),
+                'shared_checked_out': len(self._checked_out),
+                'max_size': self.max_size,
+            }
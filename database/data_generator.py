@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Генератор синтетических данных для DatabaseManager.
+
+Создаёт пользователей трёх ролей, проекты с пересекающимися сроками и задачи,
+распределённые по проектам и исполнителям неравномерно (по закону Ципфа: у немногих
+проектов и людей большая часть задач). Приоритеты и статусы смешаны, часть
+незавершённых задач просрочена. При одинаковых seed и now результат одинаков.
+Строки вставляются порциями через bulk_insert внутри DatabaseManager.bulk_load.
+
+Запуск: python -m database.data_generator tasks.db --users 1000 --projects 200 --tasks 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from database.bulk_insert import bulk_insert
+from database.database_manager import DatabaseManager
+
+ROLE_WEIGHTS = {'admin': 0.05, 'manager': 0.15, 'developer': 0.8}
+PRIORITY_WEIGHTS = {1: 0.2, 2: 0.5, 3: 0.3}
+STATUS_WEIGHTS = {'pending': 0.4, 'in_progress': 0.25, 'completed': 0.35}
+
+# Доля просроченных среди незавершённых задач
+DEFAULT_OVERDUE_FRACTION = 0.2
+# Показатель распределения Ципфа для задач по проектам и исполнителям; 0 - равномерно
+DEFAULT_SKEW = 1.1
+DEFAULT_CHUNK_SIZE = 20_000
+
+# Сроки проектов: начало в пределах двух лет до now, длительность от месяца до года
+PROJECT_START_WINDOW = timedelta(days=730)
+PROJECT_MIN_DAYS, PROJECT_MAX_DAYS = 30, 365
+# Просроченные задачи должны были быть готовы не раньше чем за 90 дней до now
+OVERDUE_WINDOW = timedelta(days=90)
+MIN_OPEN_HORIZON = timedelta(days=14)
+
+WORDS = ("fix", "bug", "report", "deploy", "review", "refactor", "login", "cache", "search",
+         "export", "import", "billing", "docs", "release", "tests", "api", "migration",
+         "dashboard", "payment", "notification", "timeout", "crash", "layout", "profile")
+
+USER_COLUMNS = ("username", "email", "role", "registration_date")
+PROJECT_COLUMNS = ("name", "description", "start_date", "end_date", "status")
+TASK_COLUMNS = ("title", "description", "priority", "status", "due_date", "project_id",
+                "assignee_id")
+
+
+def generate_data(db: DatabaseManager, users: int = 100, projects: int = 20,
+                  tasks: int = 10_000, seed: int = 0, now: datetime = None,
+                  overdue_fraction: float = DEFAULT_OVERDUE_FRACTION,
+                  skew: float = DEFAULT_SKEW, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Добавляет в db users пользователей, projects проектов и tasks задач.
+
+    Возвращает число вставленных строк по таблицам. Данные дописываются к уже
+    существующим; имена пользователей и проектов продолжают нумерацию по id.
+    """
+    if tasks and not (users and projects):
+        raise ValueError("Tasks need at least one user and one project")
+    rng = random.Random(seed)
+    now = now or datetime.now().replace(microsecond=0)
+    conn = db.get_connection()
+    with db.bulk_load():
+        user_ids = bulk_insert(conn, "users", USER_COLUMNS,
+                               _user_rows(rng, _next_id(conn, "users"), users, now),
+                               tuple, chunk_size).ids
+        spans = _project_spans(rng, projects, now)
+        project_ids = bulk_insert(conn, "projects", PROJECT_COLUMNS,
+                                  _project_rows(rng, _next_id(conn, "projects"), spans, now),
+                                  tuple, chunk_size).ids
+        # Строки, которые не вставились (например, занятое имя), получают id None:
+        # задачи на них не ссылаются
+        user_ids = [user_id for user_id in user_ids if user_id is not None]
+        projects_with_spans = [(project_id, span) for project_id, span in zip(project_ids, spans)
+                               if project_id is not None]
+        if tasks and not (user_ids and projects_with_spans):
+            raise ValueError("No users or projects were inserted, tasks cannot be assigned")
+        task_rows = _task_rows(rng, tasks, projects_with_spans, user_ids, now,
+                               overdue_fraction, skew, chunk_size)
+        inserted = bulk_insert(conn, "tasks", TASK_COLUMNS, task_rows, tuple, chunk_size)
+    return {'users': len(user_ids), 'projects': len(projects_with_spans),
+            'tasks': inserted.inserted}
+
+
+def _next_id(conn, table: str) -> int:
+    return conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+
+
+def _weights(weights: dict):
+    return list(weights), list(accumulate(weights.values()))
+
+
+def _zipf_cum_weights(rng: random.Random, count: int, skew: float) -> list:
+    """Накопленные веса Ципфа, перемешанные, чтобы «тяжёлые» id не шли подряд."""
+    weights = [1 / (rank + 1) ** skew for rank in range(count)]
+    rng.shuffle(weights)
+    return list(accumulate(weights))
+
+
+def _user_rows(rng: random.Random, first_id: int, count: int, now: datetime):
+    roles = rng.choices(*_weights(ROLE_WEIGHTS), k=count)
+    for i in range(count):
+        name = f"user{first_id + i}"
+        registered = now - timedelta(days=rng.randrange(3 * 365), seconds=rng.randrange(86400))
+        yield name, f"{name}@example.com", roles[i], registered.isoformat(timespec='seconds')
+
+
+def _project_spans(rng: random.Random, count: int, now: datetime) -> list:
+    """(начало, конец) каждого проекта; сроки случайны и поэтому пересекаются."""
+    spans = []
+    for _ in range(count):
+        start = now - PROJECT_START_WINDOW * rng.random()
+        spans.append((start, start + timedelta(days=rng.randint(PROJECT_MIN_DAYS,
+                                                                PROJECT_MAX_DAYS))))
+    return spans
+
+
+def _project_rows(rng: random.Random, first_id: int, spans: list, now: datetime):
+    for i, (start, end) in enumerate(spans):
+        if rng.random() < 0.1:
+            status = 'on_hold'
+        else:
+            status = 'completed' if end < now and rng.random() < 0.8 else 'active'
+        yield (f"Project {first_id + i}", " ".join(rng.choices(WORDS, k=6)),
+               start.isoformat(timespec='seconds'), end.isoformat(timespec='seconds'), status)
+
+
+class _MinuteClock:
+    """Время в минутах от полуночи дня now; строки дат по дням кэшируются.
+
+    Сроки задач генерируются с точностью до минуты: так их перевод в ISO-строку -
+    это поиск в двух таблицах вместо datetime-арифметики на каждую строку.
+    """
+
+    TIMES = [f"{hour:02d}:{minute:02d}:00" for hour in range(24) for minute in range(60)]
+
+    def __init__(self, now: datetime):
+        self.midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.now = self.minutes(now)
+        self._dates = {}
+
+    def minutes(self, moment: datetime) -> int:
+        return (moment - self.midnight) // timedelta(minutes=1)
+
+    def format(self, minutes: int) -> str:
+        day, minute = divmod(minutes, 1440)
+        date = self._dates.get(day)
+        if date is None:
+            date = self._dates[day] = (self.midnight + timedelta(days=day)).date().isoformat()
+        return f"{date}T{self.TIMES[minute]}"
+
+
+def _due_ranges(clock: _MinuteClock, project_id: int, span: tuple) -> tuple:
+    """(id проекта, начало, длительность, горизонт открытых задач) в минутах."""
+    start, end = clock.minutes(span[0]), clock.minutes(span[1])
+    horizon = max(end - clock.now, MIN_OPEN_HORIZON // timedelta(minutes=1))
+    return project_id, start, end - start, horizon
+
+
+def _task_rows(rng: random.Random, count: int, projects: list, user_ids: list, now: datetime,
+               overdue_fraction: float, skew: float, chunk_size: int):
+    """Строки задач; случайные поля выбираются сразу для целой порции через rng.choices.
+
+    Завершённые задачи получают срок внутри сроков проекта, незавершённые с
+    вероятностью overdue_fraction - срок в прошлом (не раньше OVERDUE_WINDOW до now),
+    остальные - в будущем, но не ближе часа от now.
+    """
+    clock = _MinuteClock(now)
+    ranges = [_due_ranges(clock, project_id, span) for project_id, span in projects]
+    overdue_window = OVERDUE_WINDOW // timedelta(minutes=1)
+    project_weights = _zipf_cum_weights(rng, len(projects), skew)
+    user_weights = _zipf_cum_weights(rng, len(user_ids), skew)
+    priorities, priority_weights = _weights(PRIORITY_WEIGHTS)
+    statuses, status_weights = _weights(STATUS_WEIGHTS)
+    random_ = rng.random
+    for offset in range(0, count, chunk_size):
+        size = min(chunk_size, count - offset)
+        chunk = zip(rng.choices(ranges, cum_weights=project_weights, k=size),
+                    rng.choices(user_ids, cum_weights=user_weights, k=size),
+                    rng.choices(priorities, cum_weights=priority_weights, k=size),
+                    rng.choices(statuses, cum_weights=status_weights, k=size),
+                    rng.choices(WORDS, k=size), rng.choices(WORDS, k=size))
+        for number, ((project_id, start, length, horizon), assignee_id, priority, status,
+                     verb, noun) in enumerate(chunk, start=offset + 1):
+            if status == 'completed':
+                due = start + int(length * random_())
+            elif random_() < overdue_fraction:
+                due = clock.now - 60 - int(overdue_window * random_())
+            else:
+                due = clock.now + 60 + int(horizon * random_())
+            yield (f"{verb} {noun} #{number}", f"{noun} {verb} task {number}", priority, status,
+                   clock.format(due), project_id, assignee_id)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_path")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--now", type=datetime.fromisoformat,
+                        help="момент, относительно которого считаются сроки (ISO 8601)")
+    parser.add_argument("--overdue", type=float, default=DEFAULT_OVERDUE_FRACTION,
+                        help="доля просроченных среди незавершённых задач")
+    parser.add_argument("--skew", type=float, default=DEFAULT_SKEW,
+                        help="неравномерность задач по проектам и исполнителям, 0 - равномерно")
+    parser.add_argument("--profile", default="bulk-load")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db_path, profile=args.profile)
+    try:
+        started = time.perf_counter()
+        counts = generate_data(db, args.users, args.projects, args.tasks, args.seed, args.now,
+                               args.overdue, args.skew)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    rows = sum(counts.values())
+    print(f"Пользователей: {counts['users']}, проектов: {counts['projects']}, "
+          f"задач: {counts['tasks']}")
+    print(f"{rows} строк за {elapsed:.1f} с ({rows / elapsed:.0f} строк/с)")
+
+
+if __name__ == "__main__":
+    main()
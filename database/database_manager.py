@@ -1,24 +1,165 @@
+import json
+import re
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Optional, Iterable, Iterator
 from models.task import Task
 from models.project import Project
 from models.user import User
+from database.connection_pool import ConnectionPool
+from database.entity_cache import LRUCache
+from database.bulk_insert import BulkInsertResult, bulk_insert
+from database.row_mappers import (
+    TASK_COLUMNS, PROJECT_COLUMNS, USER_COLUMNS, select_list,
+    map_task, map_project, map_user, tasks_from_rows, projects_from_rows, users_from_rows
+)
+from database.pagination import encode_cursor, decode_cursor
+from database.task_frame import TaskFrame, FRAME_SELECT
+from database import change_log
+from database.read_only_executor import ReadOnlyExecutor, READ_PRAGMAS
+from database.change_log import Change, EntityChanges
+from database.performance_profiles import (
+    DEFAULT_PROFILE, resolve_profile, apply_pragmas, read_pragmas
+)
+
+# Управляемый набор индексов таблицы tasks: имя -> столбцы.
+# Индексы с префиксом idx_tasks_, которых нет в наборе, удаляются при инициализации.
+TASK_INDEXES = {
+    'idx_tasks_project_id': ('project_id',),
+    'idx_tasks_assignee_status': ('assignee_id', 'status'),
+    'idx_tasks_status_due_date': ('status', 'due_date'),
+    'idx_tasks_due_date': ('due_date',),
+    # Для ORDER BY <столбец>, id в get_tasks_window: индекс по одному столбцу уже упорядочен
+    # по (столбец, rowid), поэтому окно читается по индексу без сортировки всей таблицы.
+    # status и assignee_id отдельных индексов не получают: хватает префиксов составных
+    # индексов выше, по которым досортировываются только строки с равным значением
+    'idx_tasks_title': ('title',),
+    'idx_tasks_priority': ('priority',),
+}
+
+# Допустимые порядки постраничной выборки: имя -> столбцы ключа (последний всегда id)
+TASK_PAGE_ORDERS = {
+    'id': ('id',),
+    'due_date': ('due_date', 'id'),
+}
+
+# Столбцы, по которым можно сортировать окно get_tasks_window (id добавляется для однозначности)
+TASK_SORT_COLUMNS = ('id', 'title', 'priority', 'status', 'due_date', 'project_id', 'assignee_id')
+
+# Триггеры, поддерживающие tasks_fts в актуальном состоянии (см. create_task_search_index)
+SEARCH_TRIGGERS = ('tasks_fts_ai', 'tasks_fts_ad', 'tasks_fts_au')
+
+DEFAULT_PAGE_SIZE = 50
+
+# Сколько строк за раз забирают потоковые итераторы iter_*
+DEFAULT_BATCH_SIZE = 500
+
+# Веса BM25 для столбцов tasks_fts: совпадение в названии важнее, чем в описании
+SEARCH_WEIGHTS = (10.0, 1.0)
+
+# Поля задачи, которые можно менять через update_task и пакетные обновления
+TASK_UPDATE_FIELDS = {
+    'title', 'description', 'priority', 'status', 'due_date', 'project_id', 'assignee_id'
+}
+
+# Сколько последних поисковых запросов помнит search_cache
+SEARCH_CACHE_SIZE = 64
+
+# Поля, от которых зависит результат search_tasks
+SEARCH_FIELDS = {'title', 'description'}
+
+# Сколько записей журнала изменений читать за один вызов changes_since по умолчанию
+DEFAULT_CHANGES_LIMIT = 1000
+
+# Не больше этого числа параметров в одном IN (...), с запасом до лимита SQLite
+IN_CHUNK_SIZE = 500
+
+_SEARCH_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _sql_value(value):
+    """Значение для параметра запроса: даты хранятся в БД ISO-строками."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+TASK_SELECT = select_list(TASK_COLUMNS)
+PROJECT_SELECT = select_list(PROJECT_COLUMNS)
+USER_SELECT = select_list(USER_COLUMNS)
 
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "tasks.db"):
+    def __init__(self, db_path: str = "tasks.db", pool_size: int = 5,
+                 profile: str = DEFAULT_PROFILE, pragmas: dict = None, cache_size: int = 0,
+                 search_cache_size: int = SEARCH_CACHE_SIZE, change_log: bool = True):
         self.db_path = db_path
+        self.change_log_enabled = change_log
+        # Кэши строк по id для get_*_by_id; по умолчанию выключены (cache_size=0).
+        # Кэш видит только записи через этот экземпляр DatabaseManager: записи других
+        # экземпляров, процессов и AsyncDatabaseManager на тот же файл он не замечает,
+        # поэтому включать его стоит, только если все записи идут через этот экземпляр.
+        self.user_cache = LRUCache(cache_size)
+        self.project_cache = LRUCache(cache_size)
+        self.task_cache = LRUCache(cache_size)
+        # Запрос -> id найденных задач; сбрасывается при любом изменении набора задач,
+        # их названий или описаний
+        self.search_cache = LRUCache(search_cache_size)
+        self.profile = profile
+        self.pragmas = resolve_profile(profile, pragmas)
+        self.pool = ConnectionPool(db_path, max_size=pool_size,
+                                   on_connect=self._configure_connection)
+        self.fts_enabled = False
         self.init_database()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """Возвращает постоянное соединение текущего потока из пула.
+
+        Соединение не закрывается после `with`: блок лишь фиксирует или откатывает транзакцию.
+        """
+        return self.pool.get_thread_connection()
+
+    def _configure_connection(self, conn):
+        apply_pragmas(conn, self.pragmas)
+
+    def get_performance_settings(self) -> dict:
+        """Возвращает профиль и фактические PRAGMA, с которыми работают соединения."""
+        settings = read_pragmas(self.get_connection())
+        settings['profile'] = self.profile
+        return settings
+
+    def read_only_executor(self, max_workers: int = None,
+                           processes: bool = False) -> ReadOnlyExecutor:
+        """Пул соединений mode=ro к этой же БД для параллельных отчётных запросов."""
+        pragmas = {name: self.pragmas[name] for name in READ_PRAGMAS if name in self.pragmas}
+        return ReadOnlyExecutor(self.db_path, max_workers, processes, pragmas)
+
+    def _get_row_cached(self, cache: LRUCache, table: str, columns: str, entity_id: int):
+        row = cache.get(entity_id)
+        if row is not None:
+            return row
+        generation = cache.generation
+        with self.get_connection() as conn:
+            row = conn.execute(f"SELECT {columns} FROM {table} WHERE id = ?",
+                               (entity_id,)).fetchone()
+        if row is not None:
+            cache.put(entity_id, row, generation)
+        return row
+
+    def cache_stats(self) -> dict:
+        """Счётчики кэшей сущностей: размер, попадания, промахи, вытеснения."""
+        return {
+            'users': self.user_cache.stats(),
+            'projects': self.project_cache.stats(),
+            'tasks': self.task_cache.stats(),
+            'search': self.search_cache.stats(),
+        }
 
     def init_database(self):
         """Создаёт все таблицы при инициализации."""
         self.create_user_table()
         self.create_project_table()
         self.create_task_table()
+        self.create_change_log()
 
     # === USERS ===
 
@@ -44,25 +185,38 @@ class DatabaseManager:
             user.id = cursor.lastrowid
             return user.id
 
+    def add_users_bulk(self, users: Iterable[User], chunk_size: int = 1000,
+                       build=None) -> BulkInsertResult:
+        """Вставляет пользователей порциями; id присваиваются объектам в порядке входа.
+
+        build(item), если задан, строит User из элемента users; см. bulk_insert.
+        """
+        return bulk_insert(
+            self.get_connection(), "users", ("username", "email", "role", "registration_date"),
+            users,
+            lambda user: (user.username, user.email, user.role, user.registration_date.isoformat()),
+            chunk_size, on_inserted=lambda user, user_id: setattr(user, "id", user_id), build=build
+        )
+
     def get_user_by_id(self, user_id: int) -> Optional[User]:
-        with self.get_connection() as conn:
-            row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
-            if row:
-                return User(
-                    username=row[1],
-                    email=row[2],
-                    role=row[3],
-                    user_id=row[0]
-                )
-            return None
+        row = self._get_row_cached(self.user_cache, "users", USER_SELECT, user_id)
+        return map_user(row) if row else None
+
+    def get_users_by_ids(self, user_ids: Iterable[int]) -> List[User]:
+        return self._get_by_ids("users", USER_SELECT, user_ids, map_user)
 
     def get_all_users(self) -> List[User]:
         with self.get_connection() as conn:
-            rows = conn.execute("SELECT * FROM users").fetchall()
-            return [
-                User(username=r[1], email=r[2], role=r[3], user_id=r[0])
-                for r in rows
-            ]
+            rows = conn.execute(f"SELECT {USER_SELECT} FROM users").fetchall()
+            return users_from_rows(rows)
+
+    def get_users_page(self, page_size: int = DEFAULT_PAGE_SIZE, cursor: str = None):
+        """Возвращает (пользователи, курсор следующей страницы или None)."""
+        return self._fetch_page("users", USER_COLUMNS, ('id',), 'id', page_size, cursor,
+                                users_from_rows)
+
+    def iter_users(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[User]:
+        return self._iter_rows("users", USER_SELECT, "", (), batch_size, map_user)
 
     def update_user(self, user_id: int, **kwargs):
         allowed_fields = {'username', 'email', 'role'}
@@ -75,10 +229,15 @@ class DatabaseManager:
 
         with self.get_connection() as conn:
             conn.execute(f"UPDATE users SET {set_clause} WHERE id = ?", values)
+        self.user_cache.invalidate(user_id)
 
     def delete_user(self, user_id: int):
         with self.get_connection() as conn:
             conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        self.user_cache.invalidate(user_id)
+        # Задачи пользователя могут удалиться каскадно
+        self.task_cache.clear()
+        self.search_cache.clear()
 
     # === PROJECTS ===
 
@@ -111,32 +270,50 @@ class DatabaseManager:
             project.id = cursor.lastrowid
             return project.id
 
+    def add_projects_bulk(self, projects: Iterable[Project], chunk_size: int = 1000,
+                          build=None) -> BulkInsertResult:
+        """Вставляет проекты порциями; id присваиваются объектам в порядке входа.
+
+        build(item), если задан, строит Project из элемента projects; см. bulk_insert.
+        """
+        return bulk_insert(
+            self.get_connection(), "projects",
+            ("name", "description", "start_date", "end_date", "status"), projects,
+            lambda project: (project.name, project.description, project.start_date.isoformat(),
+                             project.end_date.isoformat(), project.status),
+            chunk_size, on_inserted=lambda project, project_id: setattr(project, "id", project_id),
+            build=build
+        )
+
     def get_project_by_id(self, project_id: int) -> Optional[Project]:
-        with self.get_connection() as conn:
-            row = conn.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
-            if row:
-                return Project(
-                    name=row[1],
-                    description=row[2],
-                    start_date=datetime.fromisoformat(row[3]),
-                    end_date=datetime.fromisoformat(row[4]),
-                    project_id=row[0]
-                )
-            return None
+        row = self._get_row_cached(self.project_cache, "projects", PROJECT_SELECT, project_id)
+        return map_project(row) if row else None
+
+    def get_projects_by_ids(self, project_ids: Iterable[int]) -> List[Project]:
+        return self._get_by_ids("projects", PROJECT_SELECT, project_ids, map_project)
 
     def get_all_projects(self) -> List[Project]:
         with self.get_connection() as conn:
-            rows = conn.execute("SELECT * FROM projects").fetchall()
-            return [
-                Project(
-                    name=r[1],
-                    description=r[2],
-                    start_date=datetime.fromisoformat(r[3]),
-                    end_date=datetime.fromisoformat(r[4]),
-                    project_id=r[0]
-                )
-                for r in rows
-            ]
+            rows = conn.execute(f"SELECT {PROJECT_SELECT} FROM projects").fetchall()
+            return projects_from_rows(rows)
+
+    def get_projects_page(self, page_size: int = DEFAULT_PAGE_SIZE, cursor: str = None):
+        """Возвращает (проекты, курсор следующей страницы или None)."""
+        return self._fetch_page("projects", PROJECT_COLUMNS, ('id',), 'id', page_size, cursor,
+                                projects_from_rows)
+
+    def iter_projects(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Project]:
+        return self._iter_rows("projects", PROJECT_SELECT, "", (), batch_size, map_project)
+
+    def get_task_completion_stats(self) -> Dict[int, tuple]:
+        """Возвращает {project_id: (завершено задач, всего задач)} одним GROUP BY."""
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT project_id, SUM(status = 'completed'), COUNT(*)
+                FROM tasks
+                GROUP BY project_id
+            """).fetchall()
+            return {project_id: (completed, total) for project_id, completed, total in rows}
 
     def update_project(self, project_id: int, **kwargs):
         allowed_fields = {'name', 'description', 'start_date', 'end_date', 'status'}
@@ -154,10 +331,15 @@ class DatabaseManager:
 
         with self.get_connection() as conn:
             conn.execute(f"UPDATE projects SET {set_clause} WHERE id = ?", values)
+        self.project_cache.invalidate(project_id)
 
     def delete_project(self, project_id: int):
         with self.get_connection() as conn:
             conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+        self.project_cache.invalidate(project_id)
+        # Задачи проекта могут удалиться каскадно
+        self.task_cache.clear()
+        self.search_cache.clear()
 
     # === TASKS ===
 
@@ -177,6 +359,114 @@ class DatabaseManager:
                     FOREIGN KEY(assignee_id) REFERENCES users(id) ON DELETE CASCADE
                 )
             """)
+        self.create_task_indexes()
+        self.create_task_search_index()
+
+    def create_task_indexes(self):
+        """Создаёт недостающие индексы из TASK_INDEXES и удаляет устаревшие."""
+        with self.get_connection() as conn:
+            existing = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tasks' "
+                "AND name LIKE 'idx\\_tasks\\_%' ESCAPE '\\'"
+            )}
+            for name in existing - set(TASK_INDEXES):
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            for name, columns in TASK_INDEXES.items():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON tasks ({', '.join(columns)})")
+
+    @contextmanager
+    def bulk_load(self):
+        """Режим массовой вставки: триггеры и индексы tasks снимаются на время блока.
+
+        Каждая строка, вставленная через триггер в tasks_fts и журнал изменений и через
+        индексы tasks, стоит в разы дороже самой вставки. Внутри блока их нет, а на выходе
+        индексы строятся заново, а новые строки одним запросом добавляются в tasks_fts и
+        журнал. Блок рассчитан только на вставки: изменения и удаления внутри него не
+        попадут ни в поиск, ни в журнал.
+
+        Триггеры и индексы - часть схемы файла БД, поэтому они пропадают для всех
+        соединений, а не только для этого экземпляра. Блок требует монопольного доступа:
+        пока он открыт, другие экземпляры DatabaseManager и процессы не должны работать с
+        этой БД - их записи не попадут в поиск и журнал, а чтения пойдут без индексов.
+        """
+        with self.get_connection() as conn:
+            last_ids = {
+                table: conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+                for table in change_log.CHANGE_LOG_TABLES
+            }
+            logged = change_log.has_change_log_triggers(conn)
+            change_log.drop_change_log_triggers(conn)
+            for name in SEARCH_TRIGGERS:
+                conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            for name in TASK_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+        try:
+            yield self
+        finally:
+            self._finish_bulk_load(last_ids, logged)
+
+    def _finish_bulk_load(self, last_ids: dict, logged: bool):
+        self.create_task_indexes()
+        if self.fts_enabled:
+            with self.get_connection() as conn:
+                conn.execute("""
+                    INSERT INTO tasks_fts(rowid, title, description)
+                    SELECT id, title, description FROM tasks WHERE id > ?
+                """, (last_ids['tasks'],))
+            self.create_task_search_index()
+        if logged:
+            # Журнал ведётся, если его триггеры стояли до блока, даже при change_log=False
+            with self.get_connection() as conn:
+                for table, last_id in last_ids.items():
+                    change_log.log_inserted(conn, table, last_id)
+                change_log.create_change_log(conn)
+        self.search_cache.clear()
+
+    def create_task_search_index(self):
+        """Создаёт FTS5-индекс по title/description и триггеры синхронизации.
+
+        Если SQLite собран без FTS5, поиск работает через LIKE.
+        """
+        with self.get_connection() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+            ).fetchone()
+            try:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                        title, description, content='tasks', content_rowid='id'
+                    )
+                """)
+            except sqlite3.OperationalError:
+                self.fts_enabled = False
+                return
+
+            conn.executescript("""
+                CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+                    INSERT INTO tasks_fts(rowid, title, description)
+                    VALUES (new.id, new.title, new.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+                    INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS tasks_fts_au
+                AFTER UPDATE OF title, description ON tasks BEGIN
+                    INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                    INSERT INTO tasks_fts(rowid, title, description)
+                    VALUES (new.id, new.title, new.description);
+                END;
+            """)
+            if not exists:
+                # Индексируем задачи, которые были в базе до появления tasks_fts
+                conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+            self.fts_enabled = True
+
+    @staticmethod
+    def build_search_query(query: str) -> str:
+        """Превращает пользовательский ввод в префиксный запрос FTS5: "слово"* для каждого слова."""
+        return " ".join(f'"{token}"*' for token in _SEARCH_TOKEN.findall(query))
 
     def add_task(self, task: Task) -> int:
         with self.get_connection() as conn:
@@ -194,116 +484,480 @@ class DatabaseManager:
                 task.assignee_id
             ))
             task.id = cursor.lastrowid
-            return task.id
+        self.search_cache.clear()
+        return task.id
+
+    def add_tasks_bulk(self, tasks: Iterable[Task], chunk_size: int = 1000,
+                       build=None) -> BulkInsertResult:
+        """Вставляет задачи порциями; id присваиваются объектам в порядке входа.
+
+        build(item), если задан, строит Task из элемента tasks; см. bulk_insert.
+        """
+        self.search_cache.clear()
+        return bulk_insert(
+            self.get_connection(), "tasks",
+            ("title", "description", "priority", "status", "due_date", "project_id", "assignee_id"),
+            tasks,
+            lambda task: (task.title, task.description, task.priority, task.status,
+                          task.due_date.isoformat(), task.project_id, task.assignee_id),
+            chunk_size, on_inserted=lambda task, task_id: setattr(task, "id", task_id), build=build
+        )
 
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
-        with self.get_connection() as conn:
-            row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
-            if row:
-                return Task(
-                    title=row[1],
-                    description=row[2],
-                    priority=row[3],
-                    due_date=datetime.fromisoformat(row[5]),
-                    project_id=row[6],
-                    assignee_id=row[7],
-                    task_id=row[0]
-                )
-            return None
+        row = self._get_row_cached(self.task_cache, "tasks", TASK_SELECT, task_id)
+        return map_task(row) if row else None
 
     def get_all_tasks(self) -> List[Task]:
         with self.get_connection() as conn:
-            rows = conn.execute("SELECT * FROM tasks").fetchall()
-            return [
-                Task(
-                    title=r[1],
-                    description=r[2],
-                    priority=r[3],
-                    due_date=datetime.fromisoformat(r[5]),
-                    project_id=r[6],
-                    assignee_id=r[7],
-                    task_id=r[0]
-                )
-                for r in rows
-            ]
+            rows = conn.execute(f"SELECT {TASK_SELECT} FROM tasks").fetchall()
+            return tasks_from_rows(rows)
+
+    def get_tasks_window(self, offset: int, limit: int, order_by: str = 'id',
+                         descending: bool = False) -> List[Task]:
+        """Возвращает limit задач начиная с позиции offset в заданном порядке.
+
+        В отличие от get_tasks_page позволяет перейти к любой позиции сразу, поэтому
+        подходит для виртуальной прокрутки таблиц; цена - OFFSET растёт с номером строки.
+        Каждый столбец из TASK_SORT_COLUMNS начинает какой-либо индекс из TASK_INDEXES,
+        так что окно читается по нему, а не сортировкой всей таблицы.
+        """
+        if order_by not in TASK_SORT_COLUMNS:
+            raise ValueError(f"Invalid order_by: {order_by}. Must be one of {TASK_SORT_COLUMNS}")
+        if offset < 0 or limit <= 0:
+            raise ValueError("offset must be >= 0 and limit positive")
+        direction = "DESC" if descending else "ASC"
+        order = f"{order_by} {direction}" if order_by == 'id' \
+            else f"{order_by} {direction}, id {direction}"
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT {TASK_SELECT} FROM tasks ORDER BY {order} LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+            return tasks_from_rows(rows)
+
+    def count_tasks(self) -> int:
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def get_tasks_page(self, page_size: int = DEFAULT_PAGE_SIZE, cursor: str = None,
+                       order_by: str = 'id'):
+        """Возвращает (задачи, курсор следующей страницы или None).
+
+        Пагинация по ключу: страница начинается строго после ключа из курсора,
+        поэтому её стоимость не зависит от номера страницы.
+        """
+        if order_by not in TASK_PAGE_ORDERS:
+            raise ValueError(f"Invalid order_by: {order_by}. "
+                             f"Must be one of {set(TASK_PAGE_ORDERS)}")
+        return self._fetch_page("tasks", TASK_COLUMNS, TASK_PAGE_ORDERS[order_by], order_by,
+                                page_size, cursor, tasks_from_rows)
+
+    def get_tasks_by_ids(self, task_ids: Iterable[int]) -> List[Task]:
+        return self._get_by_ids("tasks", TASK_SELECT, task_ids, map_task)
+
+    def _get_by_ids(self, table: str, columns: str, ids: Iterable[int], map_row) -> list:
+        """Возвращает объекты в порядке ids; отсутствующие id пропускаются."""
+        ids = list(dict.fromkeys(ids))
+        found = {}
+        with self.get_connection() as conn:
+            for start in range(0, len(ids), IN_CHUNK_SIZE):
+                chunk = ids[start:start + IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = conn.execute(f"SELECT {columns} FROM {table} WHERE id IN ({placeholders})",
+                                    chunk).fetchall()
+                found.update((row[0], row) for row in rows)
+        return [map_row(found[entity_id]) for entity_id in ids if entity_id in found]
+
+    def get_task_frame(self, batch_size: int = DEFAULT_BATCH_SIZE,
+                       use_numpy: bool = None) -> TaskFrame:
+        """Колоночный снимок всех задач, собранный одним потоковым проходом по tasks."""
+        rows = self._iter_rows("tasks", FRAME_SELECT, "", (), batch_size, tuple)
+        return TaskFrame.from_rows(rows, db=self, use_numpy=use_numpy)
+
+    def iter_tasks(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Task]:
+        return self._iter_rows("tasks", TASK_SELECT, "", (), batch_size, map_task)
+
+    def iter_tasks_by_project(self, project_id: int,
+                              batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Task]:
+        return self._iter_rows("tasks", TASK_SELECT, "project_id = ?", (project_id,), batch_size,
+                               map_task)
+
+    def iter_tasks_by_user(self, user_id: int,
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Task]:
+        return self._iter_rows("tasks", TASK_SELECT, "assignee_id = ?", (user_id,), batch_size,
+                               map_task)
+
+    def _iter_rows(self, table: str, columns: str, where: str, params: tuple, batch_size: int,
+                   map_row):
+        """Лениво отдаёт объекты в порядке id порциями по batch_size строк.
+
+        Каждая порция - отдельный запрос по ключу (id > последнего отданного) через
+        соединение потока, который сейчас читает генератор; между порциями курсор не
+        держится. Поэтому недочитанные генераторы не занимают общий пул, а отмена в
+        AsyncRunner прерывает именно то соединение, на котором идёт запрос. Единого снимка
+        нет: строки, добавленные во время обхода, попадут в выдачу, если их id больше
+        текущего. Первым столбцом columns должен быть id.
+        """
+        conditions = " AND ".join(["id > ?"] + ([where] if where else []))
+        sql = f"SELECT {columns} FROM {table} WHERE {conditions} ORDER BY id LIMIT ?"
+        last_id = 0  # id из AUTOINCREMENT начинаются с 1
+        while True:
+            rows = self.get_connection().execute(sql, (last_id, *params, batch_size)).fetchall()
+            yield from map(map_row, rows)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def _fetch_page(self, table: str, columns: tuple, key_columns: tuple, order_by: str,
+                    page_size: int, cursor: str, from_rows):
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        key = ", ".join(key_columns)
+        where, params = "", []
+        if cursor is not None:
+            after = decode_cursor(cursor, order_by)
+            if len(after) != len(key_columns):
+                raise ValueError(f"Invalid page cursor: {cursor}")
+            where = f"WHERE ({key}) > ({', '.join('?' * len(after))})"
+            params.extend(after)
+
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT {select_list(columns)} FROM {table} {where} ORDER BY {key} LIMIT ?",
+                params + [page_size + 1]
+            ).fetchall()
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_key = tuple(last[columns.index(c)] for c in key_columns)
+            next_cursor = encode_cursor(order_by, next_key)
+        return from_rows(rows), next_cursor
 
     def update_task(self, task_id: int, **kwargs):
-        allowed_fields = {'title', 'description', 'priority', 'status', 'due_date', 'project_id', 'assignee_id'}
-        updates = {k: v for k, v in kwargs.items() if k in allowed_fields}
+        updates = self._task_updates(kwargs)
         if not updates:
             return
 
-       
+        set_clause = ", ".join(f"{k} = ?" for k in updates)
+        values = list(updates.values()) + [task_id]
+
+        with self.get_connection() as conn:
+            conn.execute(f"UPDATE tasks SET {set_clause} WHERE id = ?", values)
+        self.task_cache.invalidate(task_id)
+        if SEARCH_FIELDS & updates.keys():
+            self.search_cache.clear()
+
+    @staticmethod
+    def _task_updates(fields: dict) -> dict:
+        updates = {k: v for k, v in fields.items() if k in TASK_UPDATE_FIELDS}
         if 'due_date' in updates and isinstance(updates['due_date'], datetime):
             updates['due_date'] = updates['due_date'].isoformat()
+        return updates
+
+    def update_tasks_by_ids(self, task_ids: Iterable[int], **kwargs) -> int:
+        """Меняет поля у набора задач одной транзакцией: UPDATE ... WHERE id IN (...) порциями.
+
+        Возвращает число изменённых строк.
+        """
+        updates = self._task_updates(kwargs)
+        task_ids = list(dict.fromkeys(task_ids))
+        if not updates or not task_ids:
+            return 0
 
         set_clause = ", ".join(f"{k} = ?" for k in updates)
-        values = list(updates.values()) + [task_id]
+        changed = 0
+        with self.get_connection() as conn:
+            for start in range(0, len(task_ids), IN_CHUNK_SIZE):
+                chunk = task_ids[start:start + IN_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = conn.execute(f"UPDATE tasks SET {set_clause} WHERE id IN ({placeholders})",
+                                      list(updates.values()) + chunk)
+                changed += cursor.rowcount
+        self.task_cache.invalidate_many(task_ids)
+        if SEARCH_FIELDS & updates.keys():
+            self.search_cache.clear()
+        return changed
+
+    def update_tasks(self, where: dict, set: dict) -> int:
+        """Меняет поля set у всех задач, подходящих под where.
+
+        where - словарь {поле: значение}; список/кортеж/множество значений превращается в IN (...).
+        Пустой where не допускается, чтобы случайно не обновить всю таблицу.
+        """
+        updates = self._task_updates(set)
+        if not updates:
+            return 0
+        if not where:
+            raise ValueError("update_tasks requires a non-empty where")
+        conditions, where_params = self._task_where(where)
+        if conditions is None:
+            return 0
+        params = list(updates.values()) + where_params
 
+        set_clause = ", ".join(f"{k} = ?" for k in updates)
         with self.get_connection() as conn:
-            conn.execute(f"UPDATE tasks SET {set_clause} WHERE id = ?", values)
+            cursor = conn.execute(
+                f"UPDATE tasks SET {set_clause} WHERE {' AND '.join(conditions)}", params)
+        # Какие именно строки попали под where, заранее неизвестно
+        self.task_cache.clear()
+        if SEARCH_FIELDS & updates.keys():
+            self.search_cache.clear()
+        return cursor.rowcount
+
+    @staticmethod
+    def _task_where(where: dict):
+        """Условия и параметры WHERE для update_tasks; (None, None), если подходящих строк нет."""
+        conditions, params = [], []
+        for field, value in where.items():
+            if field != 'id' and field not in TASK_UPDATE_FIELDS:
+                raise ValueError(f"Unknown task field in where: {field}")
+            if isinstance(value, Iterable) and not isinstance(value, (str, bytes)):
+                value = list(value)
+                if not value:
+                    return None, None
+                # Список передаётся одним JSON-параметром, как в search_tasks(within=...):
+                # число значений не упирается в лимит переменных SQLite
+                conditions.append(f"{field} IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps([_sql_value(item) for item in value]))
+            else:
+                conditions.append(f"{field} = ?")
+                params.append(_sql_value(value))
+        return conditions, params
 
     def delete_task(self, task_id: int):
         with self.get_connection() as conn:
             conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-
-    def search_tasks(self, query: str) -> List[Task]:
-        query = f"%{query}%"
+        self.task_cache.invalidate(task_id)
+        self.search_cache.clear()
+
+    def search_tasks(self, query: str, limit: int = None,
+                     within: Iterable[int] = None) -> List[Task]:
+        """Ищет задачи по названию и описанию; результаты FTS5 упорядочены по BM25.
+
+        within ограничивает поиск задачами с указанными id, например результатом
+        предыдущего, более короткого запроса.
+        """
+        fts_query = self.build_search_query(query) if self.fts_enabled else ""
+        limit = -1 if limit is None else limit
+        scope, scope_params = "", ()
+        if within is not None:
+            # Один параметр вместо IN (?, ?, ...): число id не ограничено лимитом SQLite
+            scope = "AND tasks.id IN (SELECT value FROM json_each(?))"
+            scope_params = (json.dumps(list(within)),)
         with self.get_connection() as conn:
-            rows = conn.execute("""
-                SELECT * FROM tasks
-                WHERE title LIKE ? OR description LIKE ?
-            """, (query, query)).fetchall()
-            return [
-                Task(
-                    title=r[1],
-                    description=r[2],
-                    priority=r[3],
-                    due_date=datetime.fromisoformat(r[5]),
-                    project_id=r[6],
-                    assignee_id=r[7],
-                    task_id=r[0]
-                )
-                for r in rows
-            ]
+            if fts_query:
+                rows = conn.execute(f"""
+                    SELECT {select_list(TASK_COLUMNS, "tasks")} FROM tasks_fts
+                    JOIN tasks ON tasks.id = tasks_fts.rowid
+                    WHERE tasks_fts MATCH ? {scope}
+                    ORDER BY bm25(tasks_fts, {SEARCH_WEIGHTS[0]}, {SEARCH_WEIGHTS[1]})
+                    LIMIT ?
+                """, (fts_query, *scope_params, limit)).fetchall()
+            else:
+                pattern = f"%{query}%"
+                rows = conn.execute(f"""
+                    SELECT {TASK_SELECT} FROM tasks
+                    WHERE (title LIKE ? OR description LIKE ?) {scope}
+                    LIMIT ?
+                """, (pattern, pattern, *scope_params, limit)).fetchall()
+            return tasks_from_rows(rows)
+
+    def can_narrow_search(self, previous: str, query: str) -> bool:
+        """True, если результаты query - подмножество результатов previous.
+
+        Так бывает, когда query продолжает previous: каждое слово FTS-запроса остаётся
+        префиксом или добавляется новое слово, а для LIKE строка previous входит в query.
+        Оба запроса при этом должны выполняться одним способом (FTS5 или LIKE).
+        """
+        if not previous or not query.startswith(previous):
+            return False
+        if not self.fts_enabled:
+            return True
+        return bool(self.build_search_query(previous)) == bool(self.build_search_query(query))
 
     def get_tasks_by_project(self, project_id: int) -> List[Task]:
         with self.get_connection() as conn:
-            rows = conn.execute("SELECT * FROM tasks WHERE project_id = ?", (project_id,)).fetchall()
-            return [
-                Task(
-                    title=r[1],
-                    description=r[2],
-                    priority=r[3],
-                    due_date=datetime.fromisoformat(r[5]),
-                    project_id=r[6],
-                    assignee_id=r[7],
-                    task_id=r[0]
-                )
-                for r in rows
-            ]
-
-    def get_tasks_by_user(self, user_id: int) -> List[Task]:
-        with self.get_connection() as conn:
-            rows = conn.execute("SELECT * FROM tasks WHERE assignee_id = ?", (user_id,)).fetchall()
-            return [
-                Task(
-                    title=r[1],
-                    description=r[2],
-                    priority=r[3],
-                    due_date=datetime.fromisoformat(r[5]),
-                    project_id=r[6],
-                    assignee_id=r[7],
-                    task_id=r[0]
-                )
-                for r in rows
-            ]
-                def create_tables(self):
+            rows = conn.execute(f"SELECT {TASK_SELECT} FROM tasks WHERE project_id = ?",
+                                (project_id,)).fetchall()
+            return tasks_from_rows(rows)
+
+    def get_tasks_by_user(self, user_id: int, status: str = None) -> List[Task]:
+        # Оба варианта запроса обслуживаются индексом idx_tasks_assignee_status
+        with self.get_connection() as conn:
+            if status is None:
+                rows = conn.execute(f"SELECT {TASK_SELECT} FROM tasks WHERE assignee_id = ?",
+                                    (user_id,)).fetchall()
+            else:
+                rows = conn.execute(
+                    f"SELECT {TASK_SELECT} FROM tasks WHERE assignee_id = ? AND status = ?",
+                    (user_id, status)
+                ).fetchall()
+            return tasks_from_rows(rows)
+
+    def count_tasks_by_user(self, user_id: int) -> int:
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tasks WHERE assignee_id = ?",
+                                (user_id,)).fetchone()[0]
+
+    def count_tasks_by_project(self, project_id: int) -> int:
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tasks WHERE project_id = ?",
+                                (project_id,)).fetchone()[0]
+
+    def count_tasks_by_status(self, project_id: int = None,
+                              assignee_id: int = None) -> Dict[str, int]:
+        """Возвращает {статус: число задач}, при необходимости в рамках проекта/исполнителя."""
+        return self._count_tasks_grouped("status", project_id, assignee_id)
+
+    def count_tasks_by_priority(self, project_id: int = None,
+                                assignee_id: int = None) -> Dict[int, int]:
+        """Возвращает {приоритет: число задач}, при необходимости в рамках проекта/исполнителя."""
+        return self._count_tasks_grouped("priority", project_id, assignee_id)
+
+    def get_task_stats_report(self, column: str, ids: Iterable[int],
+                              executor: ReadOnlyExecutor = None, now: datetime = None) -> dict:
+        """Для каждого id из ids: задачи по статусам, всего и просроченные.
+
+        column - 'project_id' или 'assignee_id'. Статистика считается одним запросом
+        с GROUP BY на каждые IN_CHUNK_SIZE id; если передан executor, порции выполняются
+        на нём параллельно, иначе по очереди на соединении текущего потока.
+        """
+        if column not in ('project_id', 'assignee_id'):
+            raise ValueError(f"Invalid report column: {column}")
+        now = (now or datetime.now()).isoformat()
+        ids = list(dict.fromkeys(ids))
+        queries = {}
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            chunk = ids[start:start + IN_CHUNK_SIZE]
+            queries[start] = (f"""
+                SELECT {column}, status, COUNT(*),
+                       SUM(status IN ('pending', 'in_progress') AND due_date < ?)
+                FROM tasks WHERE {column} IN ({", ".join("?" * len(chunk))})
+                GROUP BY {column}, status
+            """, (now, *chunk))
+        if executor is not None:
+            results = executor.run_all(queries).values()
+        else:
+            conn = self.get_connection()
+            results = [conn.execute(sql, params).fetchall() for sql, params in queries.values()]
+
+        report = {entity_id: {'by_status': {}, 'total': 0, 'overdue': 0} for entity_id in ids}
+        for rows in results:
+            for entity_id, status, count, overdue in rows:
+                stats = report[entity_id]
+                stats['by_status'][status] = count
+                stats['total'] += count
+                stats['overdue'] += overdue or 0
+        return report
+
+    def _count_tasks_grouped(self, column: str, project_id: int = None,
+                             assignee_id: int = None) -> dict:
+        conditions, params = self._scope_conditions(project_id, assignee_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self.get_connection() as conn:
+            rows = conn.execute(f"SELECT {column}, COUNT(*) FROM tasks {where} GROUP BY {column}",
+                                params).fetchall()
+            return dict(rows)
+
+    @staticmethod
+    def _scope_conditions(project_id: int = None, assignee_id: int = None):
+        """Условия WHERE и параметры для необязательных фильтров по проекту и исполнителю."""
+        conditions, params = [], []
+        if project_id is not None:
+            conditions.append("project_id = ?")
+            params.append(project_id)
+        if assignee_id is not None:
+            conditions.append("assignee_id = ?")
+            params.append(assignee_id)
+        return conditions, params
+
+    def get_overdue_tasks(self, now: datetime = None, project_id: int = None,
+                          assignee_id: int = None, limit: int = None) -> List[Task]:
+        """Возвращает незавершённые задачи со сроком раньше now.
+
+        Условие записано как status IN (...), а не status != 'completed',
+        чтобы SQLite мог пройти по индексу idx_tasks_status_due_date.
+        """
+        now = now or datetime.now()
+        scope, scope_params = self._scope_conditions(project_id, assignee_id)
+        conditions = ["status IN ('pending', 'in_progress')", "due_date < ?"] + scope
+        params = [now.isoformat()] + scope_params
+        params.append(-1 if limit is None else limit)
+
+        with self.get_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT {TASK_SELECT} FROM tasks
+                WHERE {" AND ".join(conditions)}
+                ORDER BY due_date, id
+                LIMIT ?
+            """, params).fetchall()
+            return tasks_from_rows(rows)
+
+    # === ЖУРНАЛ ИЗМЕНЕНИЙ ===
+
+    def create_change_log(self):
+        """Создаёт журнал изменений и его триггеры; при change_log=False ничего не делает.
+
+        Триггеры общие для всех соединений к файлу БД, поэтому change_log=False не снимает
+        уже установленные другими экземплярами: этот экземпляр лишь не ставит их сам.
+        """
+        if not self.change_log_enabled:
+            return
+        with self.get_connection() as conn:
+            change_log.create_change_log(conn)
+
+    def last_change_seq(self) -> int:
+        """Номер последней записи журнала; с него клиент начинает следующий changes_since."""
+        with self.get_connection() as conn:
+            return change_log.last_seq(conn)
+
+    def changes_since(self, seq: int = 0, limit: int = DEFAULT_CHANGES_LIMIT,
+                      entity: str = None) -> List[Change]:
+        """Записи журнала (seq, entity, entity_id, op, changed_at) с номером больше seq.
+
+        entity - имя таблицы ('tasks', 'projects', 'users') или None для всех.
+        Если записи после seq уже удалены truncate_change_log, бросает ChangeLogTruncated.
+        """
+        if entity is not None and entity not in change_log.CHANGE_LOG_TABLES:
+            raise ValueError(f"Unknown entity: {entity}. "
+                             f"Must be one of {change_log.CHANGE_LOG_TABLES}")
+        with self.get_connection() as conn:
+            return change_log.changes_since(conn, seq, limit, entity)
+
+    def get_entity_changes(self, entity: str, seq: int = 0,
+                           limit: int = DEFAULT_CHANGES_LIMIT) -> EntityChanges:
+        """Изменённые после seq объекты сущности entity и id удалённых."""
+        changes = self.changes_since(seq, limit, entity)
+        changed_ids, deleted = change_log.split_changes(changes)
+        loaders = {
+            'tasks': self.get_tasks_by_ids,
+            'projects': self.get_projects_by_ids,
+            'users': self.get_users_by_ids,
+        }
+        changed = loaders[entity](changed_ids)
+        # Объект мог удалиться уже после прочитанной порции журнала
+        found = {obj.id for obj in changed}
+        deleted += [entity_id for entity_id in changed_ids if entity_id not in found]
+        new_seq = changes[-1].seq if changes else seq
+        return EntityChanges(changed, deleted, new_seq, has_more=len(changes) == limit)
+
+    def compact_change_log(self, upto_seq: int = None) -> int:
+        with self.get_connection() as conn:
+            return change_log.compact_change_log(conn, upto_seq)
+
+    def truncate_change_log(self, before_seq: int) -> int:
+        with self.get_connection() as conn:
+            return change_log.truncate_change_log(conn, before_seq)
+
+    def create_tables(self):
         """Создаёт все таблицы (для тестов)"""
         self.create_user_table()
         self.create_project_table()
         self.create_task_table()
 
     def close(self):
-        """Закрывает соединение (для совместимости с тестами)"""
-        pass
\ No newline at end of file
+        """Закрывает все соединения пула"""
+        self.pool.close()
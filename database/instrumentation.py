@@ -0,0 +1,375 @@
+import inspect
+import json
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from functools import wraps
+
+from database.bulk_insert import BulkInsertResult
+from database.change_log import EntityChanges
+from database.task_frame import TaskFrame
+
+# Верхние границы корзин гистограммы задержек, мс; всё длиннее попадает в последнюю корзину
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000,
+                      10000)
+
+DEFAULT_SLOW_QUERY_MS = 100.0
+DEFAULT_SLOW_LOG_SIZE = 100
+DEFAULT_RECENT_SIZE = 1000
+
+# Методы DatabaseManager, которые не оборачиваются: они не выполняют запросов сами
+# (get_connection вызывается внутри почти каждого метода) или возвращают контекст
+NOT_INSTRUMENTED = {'get_connection', 'close', 'bulk_load'}
+
+# Запросы, для которых имеет смысл EXPLAIN QUERY PLAN
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Метод, к которому относятся запросы вне обёрнутых методов (например, из тестов)
+OUTSIDE_METHODS = '(outside)'
+
+# Строковые, BLOB- и числовые литералы. sqlite3 передаёт в трассировку SQL с уже
+# подставленными параметрами, поэтому без capture_params литералы заменяются на "?"
+_LITERAL = re.compile(r"(?<!\w)[xX]'[0-9a-fA-F]*'|'(?:[^']|'')*'"
+                      r"|(?<![\w.])\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+
+
+def mask_literals(sql: str) -> str:
+    """SQL с литералами, заменёнными на "?": значения параметров не попадают в журналы."""
+    return _LITERAL.sub('?', sql)
+
+
+class LatencyHistogram:
+    """Гистограмма задержек с фиксированными корзинами LATENCY_BUCKETS_MS.
+
+    Перцентили оцениваются верхней границей корзины, в которую они попадают.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                if index == len(LATENCY_BUCKETS_MS):
+                    break
+                return min(LATENCY_BUCKETS_MS[index], self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        bounds = [str(bound) for bound in LATENCY_BUCKETS_MS] + ['inf']
+        return {
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'max_ms': self.max_ms,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'buckets': dict(zip(bounds, self.counts)),
+        }
+
+
+class _MethodStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.rows = 0
+        self.statements = 0
+
+    def to_dict(self) -> dict:
+        stats = self.latency.to_dict()
+        stats.update(errors=self.errors, rows=self.rows, statements=self.statements)
+        return stats
+
+
+class _Call:
+    """Один вызов обёрнутого метода: время внутри него, число запросов и медленные запросы."""
+
+    __slots__ = ('method', 'elapsed', 'statements', 'slow')
+
+    def __init__(self, method: str):
+        self.method = method
+        self.elapsed = 0.0
+        self.statements = 0
+        self.slow = []  # [(sql, длительность, мс)]
+
+
+# Как считать строки в результатах разных типов
+ROW_COUNTERS = (
+    (BulkInsertResult, lambda result: result.inserted),
+    (EntityChanges, lambda result: len(result.changed) + len(result.deleted)),
+    ((list, dict, TaskFrame), len),
+)
+
+
+def count_rows(result) -> int:
+    """Число строк в результате метода: длина списков, размер порции, 1 для скаляров."""
+    for types, counter in ROW_COUNTERS:
+        if isinstance(result, types):
+            return counter(result)
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], list):
+        return len(result[0])  # страница: (строки, курсор)
+    return 0 if result is None else 1
+
+
+class QueryInstrumentation:
+    """Замеры вызовов DatabaseManager и выполняемых ими SQL-запросов.
+
+    enable() подменяет публичные методы на обёртки только у переданного экземпляра
+    и ставит sqlite3 set_trace_callback на его соединения; disable() всё возвращает.
+    Пока замеры выключены, DatabaseManager работает без каких-либо обёрток.
+
+    Для каждого метода копится гистограмма задержек, число ошибок, строк и запросов.
+    Время запроса считается от его начала до начала следующего запроса в том же потоке
+    или до выхода из метода, поэтому включает разбор строк в Python. Запросы дольше
+    slow_query_ms попадают в журнал медленных запросов вместе с EXPLAIN QUERY PLAN и,
+    если задан slow_log_path, дописываются туда строками JSON. Запросы ReadOnlyExecutor
+    идут через отдельные соединения и учитываются только во времени вызвавшего метода.
+
+    В журналы (slow_queries, recent, slow_log_path) SQL попадает с литералами,
+    заменёнными на "?", чтобы туда не утекали значения параметров; заодно маскируются
+    и литералы, записанные в самом запросе. capture_params=True сохраняет SQL с
+    подставленными значениями.
+    """
+
+    def __init__(self, db, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS, explain: bool = True,
+                 slow_log_size: int = DEFAULT_SLOW_LOG_SIZE, slow_log_path: str = None,
+                 recent_size: int = DEFAULT_RECENT_SIZE, capture_params: bool = False):
+        self.db = db
+        self.slow_query_ms = slow_query_ms
+        self.explain = explain
+        self.capture_params = capture_params
+        self.slow_log_path = slow_log_path
+        self.slow_queries = deque(maxlen=slow_log_size)
+        self.recent = deque(maxlen=recent_size)  # последние запросы: метод, SQL, мс
+        self._methods = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._on_connect = None
+        self.enabled = False
+
+    # === Включение и выключение ===
+
+    def enable(self):
+        if self.enabled:
+            return self
+        for name, method in self._public_methods():
+            setattr(self.db, name, self._wrap(name, method))
+        pool = self.db.pool
+        self._on_connect = pool.on_connect
+        pool.on_connect = self._connect_hook(pool.on_connect)
+        for conn in pool.connections():
+            conn.set_trace_callback(self._on_statement)
+        self.enabled = True
+        return self
+
+    def disable(self):
+        if not self.enabled:
+            return
+        for name, _ in self._public_methods():
+            self.db.__dict__.pop(name, None)
+        pool = self.db.pool
+        pool.on_connect = self._on_connect
+        for conn in pool.connections():
+            try:
+                conn.set_trace_callback(None)
+            except sqlite3.ProgrammingError:
+                pass  # соединение уже закрыто
+        self.enabled = False
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.disable()
+
+    def _public_methods(self):
+        for name, _ in inspect.getmembers(type(self.db), inspect.isfunction):
+            if not name.startswith('_') and name not in NOT_INSTRUMENTED:
+                yield name, getattr(self.db, name)
+
+    def _connect_hook(self, on_connect):
+        def hook(conn):
+            if on_connect is not None:
+                on_connect(conn)
+            conn.set_trace_callback(self._on_statement)
+        return hook
+
+    # === Данные ===
+
+    def snapshot(self) -> dict:
+        """Копия накопленных данных: статистика по методам, медленные и последние запросы."""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'slow_query_ms': self.slow_query_ms,
+                'methods': {name: stats.to_dict() for name, stats in sorted(self._methods.items())},
+                'slow_queries': list(self.slow_queries),
+                'recent': list(self.recent),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+            self.slow_queries.clear()
+            self.recent.clear()
+
+    def _stats(self, method: str) -> _MethodStats:
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = self._methods[method] = _MethodStats()
+        return stats
+
+    # === Обёртки методов ===
+
+    def _state(self):
+        state = self._local
+        if not hasattr(state, 'calls'):
+            state.calls = []         # стек вызовов обёрнутых методов в этом потоке
+            state.statement = None   # (sql, начало, вызов) выполняющегося запроса
+            state.explaining = False
+        return state
+
+    def _wrap(self, name: str, method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            call = _Call(name)
+            try:
+                result = self._run(call, method, args, kwargs)
+            except Exception:
+                self._finish(call, 0, failed=True)
+                raise
+            if inspect.isgenerator(result):
+                return self._iterate(call, result)
+            self._finish(call, count_rows(result))
+            return result
+        return wrapper
+
+    def _run(self, call: _Call, func, args=(), kwargs=None):
+        state = self._state()
+        state.calls.append(call)
+        started = time.perf_counter()
+        try:
+            return func(*args, **(kwargs or {}))
+        finally:
+            self._end_statement(state, call)
+            call.elapsed += time.perf_counter() - started
+            state.calls.pop()
+
+    def _iterate(self, call: _Call, iterator):
+        """Отдаёт элементы iter_*; в задержку метода входит только время внутри next()."""
+        rows, failed = 0, False
+        try:
+            while True:
+                try:
+                    item = self._run(call, next, (iterator,))
+                except StopIteration:
+                    return
+                rows += 1
+                yield item
+        except Exception:
+            failed = True
+            raise
+        finally:
+            iterator.close()
+            self._finish(call, rows, failed)
+
+    def _finish(self, call: _Call, rows: int, failed: bool = False):
+        slow = [self._slow_entry(call, sql, ms, rows) for sql, ms in call.slow]
+        with self._lock:
+            stats = self._stats(call.method)
+            stats.latency.record(call.elapsed * 1000)
+            stats.rows += rows
+            stats.statements += call.statements
+            stats.errors += failed
+            self.slow_queries.extend(slow)
+        if slow and self.slow_log_path:
+            with open(self.slow_log_path, 'a', encoding='utf-8') as f:
+                for entry in slow:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    # === Трассировка запросов ===
+
+    def _on_statement(self, sql: str):
+        state = self._state()
+        # Запросы триггеров и виртуальных таблиц (FTS5) приходят с префиксом "--"
+        # и выполняются внутри текущего запроса, поэтому входят в его время
+        if state.explaining or sql.startswith('--'):
+            return
+        current = state.statement
+        now = time.perf_counter()
+        if current is not None:
+            if current[0] == sql:
+                return  # тот же запрос: в 3.11 триггеры и executemany сообщают его повторно
+            self._close_statement(current, now)
+        call = state.calls[-1] if state.calls else None
+        state.statement = (sql, now, call)
+
+    def _end_statement(self, state, call: _Call):
+        current = state.statement
+        if current is not None and current[2] is call:
+            self._close_statement(current, time.perf_counter())
+            state.statement = None
+
+    def _close_statement(self, statement: tuple, now: float):
+        sql, started, call = statement
+        ms = (now - started) * 1000
+        method = call.method if call is not None else OUTSIDE_METHODS
+        with self._lock:
+            self.recent.append({'method': method, 'sql': self._logged_sql(sql),
+                                'duration_ms': ms})
+            if call is None:
+                self._stats(method).statements += 1
+        if call is not None:
+            call.statements += 1
+            if ms >= self.slow_query_ms:
+                call.slow.append((sql, ms))
+
+    def _slow_entry(self, call: _Call, sql: str, ms: float, rows: int) -> dict:
+        return {
+            'at': datetime.now().isoformat(timespec='milliseconds'),
+            'method': call.method,
+            'sql': self._logged_sql(sql),
+            'duration_ms': ms,
+            'rows': rows,
+            # План строится по запросу с подставленными значениями: они влияют на выбор индекса
+            'plan': self._explain(sql) if self.explain else None,
+        }
+
+    def _logged_sql(self, sql: str) -> str:
+        return sql if self.capture_params else mask_literals(sql)
+
+    def _explain(self, sql: str):
+        """Строки EXPLAIN QUERY PLAN с отступом по вложенности; None, если план не получить."""
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return None
+        state = self._state()
+        state.explaining = True
+        try:
+            rows = self.db.get_connection().execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        except sqlite3.Error:
+            return None
+        finally:
+            state.explaining = False
+        depth = {0: -1}
+        plan = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            plan.append("  " * depth[node_id] + detail)
+        return plan
@@ -0,0 +1,20 @@
+import base64
+import json
+
+
+def encode_cursor(order_by: str, key: tuple) -> str:
+    """Упаковывает ключ последней строки страницы в непрозрачную строку-курсор."""
+    payload = json.dumps({'o': order_by, 'k': list(key)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, order_by: str) -> tuple:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        key = tuple(payload['k'])
+        cursor_order = payload['o']
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid page cursor: {cursor}") from e
+    if cursor_order != order_by:
+        raise ValueError(f"Cursor was issued for order_by={cursor_order}, not {order_by}")
+    return key
@@ -0,0 +1,102 @@
+import sqlite3
+
+# Наборы PRAGMA, применяемые к каждому новому соединению.
+# cache_size < 0 задаётся в КиБ, mmap_size - в байтах, busy_timeout - в мс.
+# journal_mode = WAL, в отличие от остальных PRAGMA, сохраняется в самом файле БД:
+# после первого подключения с любым из профилей все клиенты этого файла, включая другие
+# процессы, работают в WAL. Чтобы не менять режим журнала файла, передайте
+# pragmas={'journal_mode': None} - PRAGMA со значением None не выставляется.
+PERFORMANCE_PROFILES = {
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16000,
+        'mmap_size': 0,
+        'busy_timeout': 5000,
+        'temp_store': 'DEFAULT',
+    },
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+    'bulk-load': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -256000,
+        'mmap_size': 1024 * 1024 * 1024,
+        'busy_timeout': 30000,
+        'temp_store': 'MEMORY',
+    },
+}
+
+DEFAULT_PROFILE = 'balanced'
+
+# Порядок важен: journal_mode должен быть выставлен до synchronous
+PRAGMA_ORDER = (
+    'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'busy_timeout', 'temp_store'
+)
+
+# Допустимые значения PRAGMA, которые задаются ключевым словом; остальные - целые числа
+_PRAGMA_KEYWORDS = {
+    'journal_mode': {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'},
+    'synchronous': {'OFF', 'NORMAL', 'FULL', 'EXTRA', '0', '1', '2', '3'},
+    'temp_store': {'DEFAULT', 'FILE', 'MEMORY', '0', '1', '2'},
+}
+
+_SYNCHRONOUS_NAMES = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+_TEMP_STORE_NAMES = {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'}
+
+
+def resolve_profile(profile: str, overrides: dict = None) -> dict:
+    """Возвращает PRAGMA профиля с учётом переопределений."""
+    if profile not in PERFORMANCE_PROFILES:
+        raise ValueError(f"Unknown performance profile: {profile}. "
+                         f"Must be one of {set(PERFORMANCE_PROFILES)}")
+    pragmas = dict(PERFORMANCE_PROFILES[profile])
+    for name, value in (overrides or {}).items():
+        if name not in PRAGMA_ORDER:
+            raise ValueError(f"Unsupported pragma: {name}. Must be one of {set(PRAGMA_ORDER)}")
+        if value is None:
+            pragmas.pop(name, None)
+        else:
+            pragmas[name] = pragma_value(name, value)
+    return pragmas
+
+
+def pragma_value(name: str, value) -> str:
+    """Проверяет значение PRAGMA и возвращает текст для подстановки в запрос.
+
+    Ключевые слова сверяются с _PRAGMA_KEYWORDS, остальные значения должны быть целыми.
+    """
+    keywords = _PRAGMA_KEYWORDS.get(name)
+    if keywords is not None:
+        text = str(value).upper()
+        if text not in keywords:
+            raise ValueError(f"Invalid value for pragma {name}: {value!r}. "
+                             f"Must be one of {keywords}")
+        return text
+    try:
+        return str(int(value))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for pragma {name}: {value!r}. Must be an integer")
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: dict):
+    for name in PRAGMA_ORDER:
+        if name in pragmas:
+            # PRAGMA не принимает параметры, поэтому значение проверяется и подставляется текстом
+            conn.execute(f"PRAGMA {name} = {pragma_value(name, pragmas[name])}").fetchall()
+
+
+def read_pragmas(conn: sqlite3.Connection) -> dict:
+    """Читает фактические значения PRAGMA у соединения."""
+    settings = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in PRAGMA_ORDER}
+    settings['journal_mode'] = settings['journal_mode'].upper()
+    synchronous = settings['synchronous']
+    settings['synchronous'] = _SYNCHRONOUS_NAMES.get(synchronous, synchronous)
+    settings['temp_store'] = _TEMP_STORE_NAMES.get(settings['temp_store'], settings['temp_store'])
+    return settings
@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from database.performance_profiles import pragma_value
+
+# PRAGMA профиля, которые имеют смысл для соединений только на чтение
+READ_PRAGMAS = ('cache_size', 'mmap_size', 'busy_timeout', 'temp_store')
+
+# Соединение процесса-исполнителя при processes=True, открывается в _init_process
+_process_conn = None
+
+
+def read_only_uri(db_path: str) -> str:
+    return f"{Path(db_path).resolve().as_uri()}?mode=ro"
+
+
+def _connect(db_path: str, pragmas: dict) -> sqlite3.Connection:
+    conn = sqlite3.connect(read_only_uri(db_path), uri=True, check_same_thread=False)
+    for name in READ_PRAGMAS:
+        if name in pragmas:
+            conn.execute(f"PRAGMA {name} = {pragma_value(name, pragmas[name])}").fetchall()
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def _init_process(db_path: str, pragmas: dict):
+    global _process_conn
+    _process_conn = _connect(db_path, pragmas)
+
+
+def _execute_in_process(sql: str, params) -> list:
+    return _process_conn.execute(sql, params).fetchall()
+
+
+class ReadOnlyExecutor:
+    """Параллельно выполняет независимые запросы на чтение через соединения mode=ro.
+
+    Каждый поток (или процесс при processes=True) открывает своё соединение к файлу БД
+    по URI file:...?mode=ro, поэтому запросы не делят одно соединение и не могут ничего
+    записать. SQLite отпускает GIL на время выполнения запроса, так что потоков обычно
+    достаточно; процессы полезны, когда много времени уходит на разбор строк в Python.
+    """
+
+    def __init__(self, db_path: str, max_workers: int = None, processes: bool = False,
+                 pragmas: dict = None):
+        if db_path == ":memory:":
+            raise ValueError("Read-only executor needs a database file")
+        self.db_path = db_path
+        self.pragmas = dict(pragmas or {})
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.processes = processes
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        if processes:
+            self._executor = ProcessPoolExecutor(self.max_workers, initializer=_init_process,
+                                                 initargs=(db_path, self.pragmas))
+        else:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="read-only")
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _connect(self.db_path, self.pragmas)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _execute_in_thread(self, sql: str, params) -> list:
+        return self._thread_connection().execute(sql, params).fetchall()
+
+    def submit(self, sql: str, params=()):
+        """Ставит запрос в очередь и возвращает Future со списком строк."""
+        if self.processes:
+            return self._executor.submit(_execute_in_process, sql, tuple(params))
+        return self._executor.submit(self._execute_in_thread, sql, tuple(params))
+
+    def run(self, queries: dict):
+        """Выполняет именованные запросы параллельно и отдаёт (имя, строки) по мере готовности.
+
+        queries - словарь имя -> SQL или (SQL, параметры). Ошибка запроса пробрасывается
+        из итератора с именем запроса в сообщении.
+        """
+        futures = {}
+        for name, query in queries.items():
+            sql, params = (query, ()) if isinstance(query, str) else query
+            futures[self.submit(sql, params)] = name
+        try:
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    rows = future.result()
+                except sqlite3.Error as e:
+                    raise sqlite3.Error(f"Query {name!r} failed: {e}") from e
+                yield name, rows
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def run_all(self, queries: dict) -> dict:
+        """Выполняет именованные запросы параллельно и возвращает словарь имя -> строки."""
+        return dict(self.run(queries))
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
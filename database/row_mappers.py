@@ -0,0 +1,63 @@
+from models.fields import LazyDateTime
+from models.task import Task
+from models.project import Project
+from models.user import User
+
+# Явные списки столбцов: порядок в SELECT совпадает с порядком полей в маппере
+TASK_COLUMNS = ('id', 'title', 'description', 'priority', 'status', 'due_date',
+                'project_id', 'assignee_id')
+PROJECT_COLUMNS = ('id', 'name', 'description', 'start_date', 'end_date', 'status')
+USER_COLUMNS = ('id', 'username', 'email', 'role', 'registration_date')
+
+_MAPPERS = {}
+
+
+def select_list(columns: tuple, table: str = None) -> str:
+    """Список столбцов для SELECT, при необходимости с префиксом таблицы."""
+    if table is None:
+        return ", ".join(columns)
+    return ", ".join(f"{table}.{column}" for column in columns)
+
+
+def compile_mapper(cls, columns: tuple):
+    """Возвращает функцию row -> объект cls для строк с заданным набором столбцов.
+
+    Функция генерируется один раз на пару (cls, columns): объект создаётся через
+    cls.__new__ без вызова __init__, а значения пишутся прямо в слоты по позициям.
+    Ленивые даты попадают в слот сырой ISO-строкой и разбираются при первом чтении.
+    """
+    key = (cls, columns)
+    mapper = _MAPPERS.get(key)
+    if mapper is not None:
+        return mapper
+
+    lines = ["def map_row(row):", "    obj = new(cls)"]
+    for index, column in enumerate(columns):
+        attribute = f"_{column}" if isinstance(cls.__dict__.get(column), LazyDateTime) else column
+        if attribute not in cls.__slots__:
+            raise ValueError(f"{cls.__name__} has no field for column {column}")
+        lines.append(f"    obj.{attribute} = row[{index}]")
+    lines.append("    return obj")
+
+    namespace = {'new': cls.__new__, 'cls': cls}
+    exec("\n".join(lines), namespace)
+    mapper = namespace['map_row']
+    _MAPPERS[key] = mapper
+    return mapper
+
+
+map_task = compile_mapper(Task, TASK_COLUMNS)
+map_project = compile_mapper(Project, PROJECT_COLUMNS)
+map_user = compile_mapper(User, USER_COLUMNS)
+
+
+def tasks_from_rows(rows) -> list:
+    return list(map(map_task, rows))
+
+
+def projects_from_rows(rows) -> list:
+    return list(map(map_project, rows))
+
+
+def users_from_rows(rows) -> list:
+    return list(map(map_user, rows))
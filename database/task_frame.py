@@ -0,0 +1,248 @@
+import calendar
+from array import array
+from collections import Counter
+from datetime import datetime
+from itertools import compress
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен, без него работаем на array
+    np = None
+
+# Коды статусов в столбце status; неизвестный статус кодируется как -1
+STATUS_CODES = ('pending', 'in_progress', 'completed')
+OPEN_STATUSES = ('pending', 'in_progress')
+
+# Столбцы снимка в порядке SELECT. Статус кодируется на стороне SQLite,
+# срок переводится в микросекунды от эпохи (наивные даты считаются UTC).
+# strftime('%f') даёт только миллисекунды, поэтому дробная часть берётся прямо
+# из ISO-строки: иначе маска расходилась бы с due_date < ? на границе секунды.
+_STATUS_CASE = " ".join(f"WHEN '{name}' THEN {code}" for code, name in enumerate(STATUS_CODES))
+FRAME_SELECT = (
+    "id, project_id, assignee_id, priority, "
+    f"CASE status {_STATUS_CASE} ELSE -1 END, "
+    "CAST(strftime('%s', due_date) AS INTEGER) * 1000000 + "
+    "CASE WHEN substr(due_date, 20, 1) = '.' "
+    "THEN CAST(substr(due_date || '000000', 21, 6) AS INTEGER) ELSE 0 END"
+)
+
+# Имя столбца -> typecode массива
+FRAME_COLUMNS = (
+    ('id', 'q'),
+    ('project_id', 'q'),
+    ('assignee_id', 'q'),
+    ('priority', 'b'),
+    ('status', 'b'),
+    ('due', 'q'),
+)
+
+
+def to_epoch(value: datetime) -> int:
+    """Микросекунды от эпохи так же, как их считает FRAME_SELECT."""
+    return calendar.timegm(value.utctimetuple()) * 1000000 + value.microsecond
+
+
+def _values(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return value
+    return (value,)
+
+
+class _ArrayOps:
+    """Операции над столбцами array и масками bytearray из 0/1."""
+
+    @staticmethod
+    def column(data: array):
+        return data
+
+    @staticmethod
+    def full(size: int):
+        return bytearray(b'\x01') * size
+
+    @staticmethod
+    def isin(column, values):
+        return bytearray(map(frozenset(values).__contains__, column))
+
+    @staticmethod
+    def less(column, bound: int):
+        return bytearray(map(bound.__gt__, column))
+
+    @staticmethod
+    def greater_equal(column, bound: int):
+        return bytearray(map(bound.__le__, column))
+
+    @staticmethod
+    def and_(left, right):
+        # В масках только 0 и 1, поэтому побитовое И больших чисел даёт поэлементное И
+        combined = int.from_bytes(left, 'little') & int.from_bytes(right, 'little')
+        return combined.to_bytes(len(left), 'little')
+
+    @staticmethod
+    def count(mask) -> int:
+        return mask.count(1)
+
+    @staticmethod
+    def select(column, mask) -> list:
+        return list(compress(column, mask))
+
+    @staticmethod
+    def count_by(column, mask) -> dict:
+        return dict(Counter(compress(column, mask)))
+
+
+class _NumpyOps:
+    """Те же операции на NumPy: столбцы - ndarray без копирования, маски - массивы bool."""
+
+    @staticmethod
+    def column(data: array):
+        return np.frombuffer(data, dtype=np.int64 if data.typecode == 'q' else np.int8)
+
+    @staticmethod
+    def full(size: int):
+        return np.ones(size, dtype=bool)
+
+    @staticmethod
+    def isin(column, values):
+        if len(values) == 1:
+            return column == next(iter(values))
+        return np.isin(column, list(values))
+
+    @staticmethod
+    def less(column, bound: int):
+        return column < bound
+
+    @staticmethod
+    def greater_equal(column, bound: int):
+        return column >= bound
+
+    @staticmethod
+    def and_(left, right):
+        return left & right
+
+    @staticmethod
+    def count(mask) -> int:
+        return int(np.count_nonzero(mask))
+
+    @staticmethod
+    def select(column, mask) -> list:
+        return column[mask].tolist()
+
+    @staticmethod
+    def count_by(column, mask) -> dict:
+        keys, counts = np.unique(column[mask], return_counts=True)
+        return dict(zip(keys.tolist(), counts.tolist()))
+
+
+class TaskFrame:
+    """Колоночный снимок таблицы tasks для быстрых фильтров и агрегатов.
+
+    Столбцы id, project_id, assignee_id и due (срок в микросекундах от эпохи) хранятся как int64,
+    priority и status (код из STATUS_CODES) - как int8. Фильтры возвращают маску,
+    которую можно передать в count, count_by, ids и to_tasks. Снимок не следит за
+    изменениями в БД: после записи его нужно построить заново.
+    """
+
+    def __init__(self, columns: dict, db=None, use_numpy: bool = None):
+        if use_numpy is None:
+            use_numpy = np is not None
+        elif use_numpy and np is None:
+            raise ImportError("NumPy is not installed")
+        self._ops = _NumpyOps if use_numpy else _ArrayOps
+        self._arrays = columns
+        self._columns = {name: self._ops.column(data) for name, data in columns.items()}
+        self.db = db
+
+    @classmethod
+    def from_rows(cls, rows, db=None, use_numpy: bool = None) -> 'TaskFrame':
+        """Строит снимок из строк в порядке FRAME_SELECT (итерируемых порциями или по одной)."""
+        columns = {name: array(typecode) for name, typecode in FRAME_COLUMNS}
+        targets = [columns[name] for name, _ in FRAME_COLUMNS]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= 4096:
+                cls._append(targets, batch)
+                batch = []
+        cls._append(targets, batch)
+        return cls(columns, db=db, use_numpy=use_numpy)
+
+    @staticmethod
+    def _append(targets, batch):
+        if batch:
+            for target, values in zip(targets, zip(*batch)):
+                target.extend(values)
+
+    def __len__(self):
+        return len(self._arrays['id'])
+
+    @property
+    def uses_numpy(self) -> bool:
+        return self._ops is _NumpyOps
+
+    @property
+    def nbytes(self) -> int:
+        return sum(data.itemsize * len(data) for data in self._arrays.values())
+
+    def column(self, name: str):
+        return self._columns[name]
+
+    # === Маски ===
+
+    def filter(self, mask=None, status=None, priority=None, project_id=None, assignee_id=None,
+               due_before: datetime = None, due_after: datetime = None):
+        """Маска строк, подходящих под все заданные условия.
+
+        status, priority, project_id и assignee_id принимают значение или список значений;
+        due_before - строго раньше, due_after - не раньше указанного момента.
+        """
+        conditions = self._conditions(status, priority, project_id, assignee_id)
+        if due_before is not None:
+            conditions.append(self._ops.less(self._columns['due'], to_epoch(due_before)))
+        if due_after is not None:
+            conditions.append(self._ops.greater_equal(self._columns['due'], to_epoch(due_after)))
+
+        if mask is None:
+            mask = conditions.pop(0) if conditions else self._ops.full(len(self))
+        for condition in conditions:
+            mask = self._ops.and_(mask, condition)
+        return mask
+
+    def _conditions(self, status, priority, project_id, assignee_id) -> list:
+        conditions = []
+        if status is not None:
+            codes = [STATUS_CODES.index(s) for s in _values(status) if s in STATUS_CODES]
+            conditions.append(self._ops.isin(self._columns['status'], codes or [-2]))
+        for name, value in (('priority', priority), ('project_id', project_id),
+                            ('assignee_id', assignee_id)):
+            if value is not None:
+                conditions.append(self._ops.isin(self._columns[name], _values(value)))
+        return conditions
+
+    def overdue_mask(self, now: datetime = None, **filters):
+        """Маска незавершённых задач со сроком раньше now, как в get_overdue_tasks."""
+        return self.filter(status=OPEN_STATUSES, due_before=now or datetime.now(), **filters)
+
+    # === Результаты ===
+
+    def count(self, mask=None) -> int:
+        return len(self) if mask is None else self._ops.count(mask)
+
+    def count_by(self, column: str, mask=None) -> dict:
+        """Число строк по значениям столбца; статусы возвращаются названиями."""
+        if mask is None:
+            mask = self._ops.full(len(self))
+        counts = self._ops.count_by(self._columns[column], mask)
+        if column == 'status':
+            return {STATUS_CODES[code]: n for code, n in counts.items() if code >= 0}
+        return counts
+
+    def ids(self, mask=None) -> list:
+        if mask is None:
+            return self._arrays['id'].tolist()
+        return self._ops.select(self._columns['id'], mask)
+
+    def to_tasks(self, mask=None) -> list:
+        """Загружает выбранные строки из БД как объекты Task в порядке снимка."""
+        if self.db is None:
+            raise ValueError("TaskFrame is not bound to a database")
+        return self.db.get_tasks_by_ids(self.ids(mask))
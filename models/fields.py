@@ -0,0 +1,25 @@
+from datetime import datetime
+
+
+class LazyDateTime:
+    """Поле-дата, которое можно присвоить ISO-строкой и разобрать только при первом чтении.
+
+    Принимает datetime или ISO-строку из БД. Значение хранится в слоте "_<имя поля>"
+    (его нужно объявить в __slots__ модели); после первого чтения там лежит готовый datetime.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.slot = owner.__dict__[f"_{name}"]
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = self.slot.__get__(obj, objtype)
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+            self.slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, value)
@@ -1,7 +1,13 @@
 from datetime import datetime
+from models.fields import LazyDateTime
 
 
 class Project:
+    __slots__ = ('id', 'name', 'description', '_start_date', '_end_date', 'status')
+
+    start_date = LazyDateTime()
+    end_date = LazyDateTime()
+
     def __init__(self, name: str, description: str, start_date: datetime, end_date: datetime, project_id: int = None):
         self.id = project_id
         self.name = name
@@ -16,12 +22,12 @@ class Project:
             raise ValueError(f"Invalid status: {new_status}. Must be one of {valid_statuses}")
         self.status = new_status
 
-    def get_progress(self) -> float:
-                total_days = (self.end_date - self.start_date).days
+    def get_progress(self, now: datetime = None) -> float:
+        total_days = (self.end_date - self.start_date).days
         if total_days <= 0:
             return 100.0 if self.status == 'completed' else 0.0
 
-        elapsed_days = (datetime.now() - self.start_date).days
+        elapsed_days = ((now or datetime.now()) - self.start_date).days
         progress = min(100.0, max(0.0, (elapsed_days / total_days) * 100))
         if self.status == 'completed':
             progress = 100.0
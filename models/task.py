@@ -1,7 +1,15 @@
 from datetime import datetime
+from models.fields import LazyDateTime
 
 
 class Task:
+    __slots__ = ('id', 'title', 'description', 'priority', 'status', '_due_date',
+                 'project_id', 'assignee_id')
+
+    VALID_STATUSES = {'pending', 'in_progress', 'completed'}
+
+    due_date = LazyDateTime()
+
     def __init__(self, title: str, description: str, priority: int,
                  due_date: datetime, project_id: int, assignee_id: int, task_id: int = None):
         self.id = task_id
@@ -13,10 +21,13 @@ class Task:
         self.project_id = project_id
         self.assignee_id = assignee_id
 
+    @classmethod
+    def validate_status(cls, new_status: str):
+        if new_status not in cls.VALID_STATUSES:
+            raise ValueError(f"Invalid status: {new_status}. Must be one of {cls.VALID_STATUSES}")
+
     def update_status(self, new_status: str):
-        valid_statuses = {'pending', 'in_progress', 'completed'}
-        if new_status not in valid_statuses:
-            raise ValueError(f"Invalid status: {new_status}. Must be one of {valid_statuses}")
+        self.validate_status(new_status)
         self.status = new_status
 
     def is_overdue(self) -> bool:
@@ -1,7 +1,12 @@
 from datetime import datetime
+from models.fields import LazyDateTime
 
 
 class User:
+    __slots__ = ('id', 'username', 'email', 'role', '_registration_date')
+
+    registration_date = LazyDateTime()
+
     def __init__(self, username: str, email: str, role: str, user_id: int = None):
         self.id = user_id
         self.username = username
@@ -0,0 +1,45 @@
+import sys
+import os
+import tempfile
+
+# Добавляем путь к модулям проекта
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks import bench_database as bench
+
+
+class TestDatabaseBenchmark:
+    """Тесты набора бенчмарков DatabaseManager и контроллеров"""
+
+    def setup_method(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "bench.db")
+        bench.seed_database(self.db_path, 200)
+
+    def teardown_method(self):
+        self.tmp.cleanup()
+
+    def test_every_public_method_has_a_case(self):
+        """Тест того, что каждый публичный метод измеряется и сценарии выполняются"""
+        results = bench.run_size(self.db_path, repeat=1, budget=0)
+
+        assert bench.uncovered(results) == []
+        stats = results["DatabaseManager.get_tasks_by_ids"]
+        assert stats["rows"] == 100
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert stats["peak_kib"] > 0
+
+    def test_compare_reports_regressions_above_threshold(self):
+        """Тест сравнения с базовым прогоном"""
+        baseline = {"results": {"1000": {"slow": {"p50_ms": 10.0}, "same": {"p50_ms": 10.0},
+                                         "tiny": {"p50_ms": 0.01}}}}
+        results = {"results": {"1000": {"slow": {"p50_ms": 13.0}, "same": {"p50_ms": 11.0},
+                                        "tiny": {"p50_ms": 0.04}, "new": {"p50_ms": 50.0}}}}
+
+        regressions = bench.compare(results, baseline, threshold=0.2)
+        assert [(size, name) for size, name, *_ in regressions] == [("1000", "slow")]
+
+    def test_percentile_interpolates(self):
+        assert bench.percentile([1.0], 99) == 1.0
+        assert bench.percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+        assert bench.percentile([0.0, 10.0], 95) == 9.5
@@ -0,0 +1,801 @@
+import asyncio
+import pytest
+import sqlite3
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import tempfile
+
+# Добавляем путь к модулям проекта
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from database.database_manager import DatabaseManager, TASK_SORT_COLUMNS
+from database.async_database_manager import AsyncDatabaseManager
+from database.change_log import ChangeLogTruncated
+from database.data_generator import generate_data
+from database.instrumentation import QueryInstrumentation, LatencyHistogram
+from controllers.async_controllers import AsyncTaskController, AsyncProjectController
+from models.task import Task
+from models.project import Project
+from models.user import User
+
+
+class TestDatabaseManager:
+    """Тесты для DatabaseManager"""
+
+    def setup_method(self):
+        """Настройка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "test.db")
+        self.db_manager = DatabaseManager(self.db_path)
+
+        self.project_id = self.db_manager.add_project(
+            Project("Тестовый проект", "Описание проекта", datetime.now(),
+                    datetime.now() + timedelta(days=30))
+        )
+        self.user_id = self.db_manager.add_user(
+            User("test_user", "test@example.com", "developer")
+        )
+
+    def teardown_method(self):
+        self.db_manager.close()
+        self.temp_dir.cleanup()
+
+    def add_task(self, title="Задача", description="Описание", priority=2, days=1, **kwargs):
+        task = Task(title, description, priority, datetime.now() + timedelta(days=days),
+                    kwargs.get("project_id", self.project_id),
+                    kwargs.get("assignee_id", self.user_id))
+        self.db_manager.add_task(task)
+        return task.id
+
+    # === Пул соединений ===
+
+    def test_connection_is_reused_within_thread(self):
+        """Тест повторного использования соединения в одном потоке"""
+        assert self.db_manager.get_connection() is self.db_manager.get_connection()
+
+    def test_threads_get_own_connections(self):
+        """Тест отдельных соединений для разных потоков"""
+        connections = []
+        thread = threading.Thread(
+            target=lambda: connections.append(self.db_manager.get_connection()))
+        thread.start()
+        thread.join()
+
+        assert connections[0] is not self.db_manager.get_connection()
+
+    def test_shared_pool_is_bounded(self):
+        """Тест ограничения размера общего пула"""
+        pool = self.db_manager.pool
+        taken = [pool.acquire() for _ in range(pool.max_size)]
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.05)
+
+        pool.release(taken.pop())
+        assert pool.acquire(timeout=0.05) is not None
+
+    def test_close_closes_connections(self):
+        """Тест закрытия всех соединений"""
+        conn = self.db_manager.get_connection()
+        self.db_manager.close()
+
+        assert self.db_manager.pool.stats()["thread_connections"] == 0
+        with pytest.raises(Exception):
+            conn.execute("SELECT 1")
+        # Закрытый пул не открывает соединения заново
+        with pytest.raises(sqlite3.ProgrammingError):
+            self.db_manager.get_all_users()
+        with pytest.raises(sqlite3.ProgrammingError):
+            self.db_manager.pool.acquire()
+
+    def test_close_keeps_connections_of_other_threads(self):
+        """Тест того, что close() из другого потока не закрывает соединение этого потока"""
+        conn = self.db_manager.get_connection()
+        thread = threading.Thread(target=self.db_manager.close)
+        thread.start()
+        thread.join()
+
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+        # При следующем обращении к пулу поток получает ошибку, а соединение закрывается
+        with pytest.raises(sqlite3.ProgrammingError):
+            self.db_manager.get_connection()
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    # === Профили производительности ===
+
+    def test_default_profile_settings(self):
+        """Тест применения профиля по умолчанию"""
+        settings = self.db_manager.get_performance_settings()
+        assert settings["profile"] == "balanced"
+        assert settings["journal_mode"] == "WAL"
+        assert settings["synchronous"] == "NORMAL"
+        assert settings["busy_timeout"] == 5000
+
+    def test_profile_with_overrides(self):
+        """Тест выбора профиля и переопределения отдельных PRAGMA"""
+        db = DatabaseManager(self.db_path, profile="bulk-load", pragmas={"busy_timeout": 1234})
+        settings = db.get_performance_settings()
+        db.close()
+
+        assert settings["profile"] == "bulk-load"
+        assert settings["synchronous"] == "OFF"
+        assert settings["busy_timeout"] == 1234
+
+    def test_unknown_profile(self):
+        """Тест неизвестного профиля"""
+        with pytest.raises(ValueError):
+            DatabaseManager(self.db_path, profile="turbo")
+
+    def test_pragma_override_values_are_checked(self):
+        """Тест проверки значений PRAGMA до подстановки в запрос"""
+        for pragmas in ({"busy_timeout": "1; DROP TABLE tasks"}, {"journal_mode": "wal2"},
+                        {"synchronous": None, "temp_store": "memory; VACUUM"}):
+            with pytest.raises(ValueError):
+                DatabaseManager(self.db_path, pragmas=pragmas)
+
+        db = DatabaseManager(self.db_path, pragmas={"synchronous": "full", "journal_mode": None})
+        settings = db.get_performance_settings()
+        db.close()
+        assert settings["synchronous"] == "FULL"
+
+    # === Индексы ===
+
+    def query_plan(self, sql, params=()):
+        conn = self.db_manager.get_connection()
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return " ".join(row[-1] for row in rows)
+
+    def test_task_indexes_created(self):
+        """Тест создания управляемых индексов"""
+        conn = self.db_manager.get_connection()
+        rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        names = {row[0] for row in rows}
+        assert {"idx_tasks_project_id", "idx_tasks_assignee_status",
+                "idx_tasks_status_due_date"} <= names
+
+    def test_task_lookups_use_indexes(self):
+        """Тест использования индексов запросами по проекту и исполнителю"""
+        assert "idx_tasks_project_id" in self.query_plan(
+            "SELECT * FROM tasks WHERE project_id = ?", (1,))
+        assert "idx_tasks_assignee_status" in self.query_plan(
+            "SELECT * FROM tasks WHERE assignee_id = ? AND status = ?", (1, "pending"))
+
+    def test_get_tasks_by_user_with_status(self):
+        """Тест фильтрации задач пользователя по статусу"""
+        task_id = self.add_task()
+        self.add_task()
+        self.db_manager.update_task(task_id, status="completed")
+
+        tasks = self.db_manager.get_tasks_by_user(self.user_id, status="completed")
+        assert [task.id for task in tasks] == [task_id]
+
+    # === Полнотекстовый поиск ===
+
+    def test_search_tasks_prefix_and_ranking(self):
+        """Тест префиксного поиска с ранжированием по BM25"""
+        in_description = self.add_task("Обычная задача", "Исправить отчёт")
+        in_title = self.add_task("Отчёт за квартал", "Собрать данные")
+        self.add_task("Другая задача", "Ничего общего")
+
+        results = self.db_manager.search_tasks("отч")
+        assert [task.id for task in results] == [in_title, in_description]
+        assert len(self.db_manager.search_tasks("отч", limit=1)) == 1
+
+    def test_search_index_follows_updates_and_deletes(self):
+        """Тест синхронизации поискового индекса триггерами"""
+        task_id = self.add_task("Старое название")
+        self.db_manager.update_task(task_id, title="Новое название")
+
+        assert self.db_manager.search_tasks("Старое") == []
+        assert [task.id for task in self.db_manager.search_tasks("Новое")] == [task_id]
+
+        self.db_manager.delete_task(task_id)
+        assert self.db_manager.search_tasks("Новое") == []
+
+    def test_search_without_fts_falls_back_to_like(self):
+        """Тест поиска через LIKE, если FTS5 недоступен"""
+        task_id = self.add_task("Важная задача")
+        self.db_manager.fts_enabled = False
+
+        assert [task.id for task in self.db_manager.search_tasks("жная")] == [task_id]
+
+    def test_search_within_ids(self):
+        """Тест сужения поиска набором id и правила продолжения запроса"""
+        first = self.add_task(title="Исправить баг")
+        self.add_task(title="Ещё баг")
+
+        assert [t.id for t in self.db_manager.search_tasks("баг", within=[first])] == [first]
+        assert self.db_manager.search_tasks("баг", within=[]) == []
+        assert self.db_manager.can_narrow_search("ба", "баг ещё")
+        assert not self.db_manager.can_narrow_search("баг", "ба")
+        assert not self.db_manager.can_narrow_search("!", "!баг")
+
+    # === Просроченные задачи ===
+
+    def test_get_overdue_tasks(self):
+        """Тест выборки просроченных задач на стороне SQL"""
+        overdue_id = self.add_task("Просроченная", days=-2)
+        completed_id = self.add_task("Завершённая", days=-2)
+        self.db_manager.update_task(completed_id, status="completed")
+        self.add_task("Будущая", days=2)
+
+        overdue = self.db_manager.get_overdue_tasks()
+        assert [task.id for task in overdue] == [overdue_id]
+        assert all(task.is_overdue() for task in overdue)
+
+    def test_get_overdue_tasks_scoped(self):
+        """Тест ограничения выборки проектом, исполнителем и лимитом"""
+        other_project = self.db_manager.add_project(
+            Project("Другой проект", "", datetime.now(), datetime.now() + timedelta(days=5)))
+        first = self.add_task(days=-3)
+        self.add_task(days=-2)
+        self.add_task(days=-1, project_id=other_project)
+
+        assert len(self.db_manager.get_overdue_tasks(project_id=self.project_id)) == 2
+        assert len(self.db_manager.get_overdue_tasks(project_id=other_project)) == 1
+        assert len(self.db_manager.get_overdue_tasks(assignee_id=self.user_id + 100)) == 0
+        assert [task.id for task in self.db_manager.get_overdue_tasks(limit=1)] == [first]
+
+    def test_overdue_query_uses_index(self):
+        """Тест использования индекса (status, due_date) для просрочки"""
+        plan = self.query_plan(
+            "SELECT * FROM tasks WHERE status IN ('pending', 'in_progress') AND due_date < ?",
+            ("2030",))
+        assert "idx_tasks_status_due_date" in plan
+
+    # === Пакетная вставка ===
+
+    def test_add_tasks_bulk(self):
+        """Тест пакетной вставки задач с id в порядке входа"""
+        tasks = [Task(f"Задача {i}", "", 2, datetime.now(), self.project_id, self.user_id)
+                 for i in range(25)]
+        result = self.db_manager.add_tasks_bulk(tasks, chunk_size=10)
+
+        assert result.inserted == 25
+        assert result.errors == []
+        assert result.ids == [task.id for task in tasks]
+        assert self.db_manager.get_task_by_id(result.ids[7]).title == "Задача 7"
+
+    def test_add_users_bulk_reports_failures(self):
+        """Тест пакетной вставки с ошибочными строками"""
+        users = [
+            User("bulk_1", "bulk_1@example.com", "developer"),
+            User("test_user", "duplicate@example.com", "developer"),  # занятое имя
+            User("bulk_2", "bulk_2@example.com", "superuser"),  # недопустимая роль
+            User("bulk_3", "bulk_3@example.com", "manager"),
+        ]
+        result = self.db_manager.add_users_bulk(users)
+
+        assert result.inserted == 2
+        assert [index for index, _ in result.errors] == [1, 2]
+        assert result.ids[1] is None and result.ids[2] is None
+        assert self.db_manager.get_user_by_id(result.ids[3]).username == "bulk_3"
+
+    def test_add_users_bulk_inside_open_transaction(self):
+        """Тест пакетной вставки внутри уже открытой транзакции соединения потока"""
+        conn = self.db_manager.get_connection()
+        conn.execute("UPDATE users SET role = 'admin' WHERE id = ?", (self.user_id,))
+        users = [User("bulk_1", "bulk_1@example.com", "developer"),
+                 User("test_user", "duplicate@example.com", "developer")]
+        result = self.db_manager.add_users_bulk(users)
+        assert result.inserted == 1 and conn.in_transaction
+
+        conn.rollback()
+        assert [user.username for user in self.db_manager.get_all_users()] == ["test_user"]
+
+    # === Постраничная выборка ===
+
+    def test_get_tasks_page_walks_all_rows(self):
+        """Тест обхода задач страницами по курсору"""
+        task_ids = [self.add_task(f"Задача {i}", days=5 - i) for i in range(7)]
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.db_manager.get_tasks_page(page_size=3, cursor=cursor,
+                                                          order_by="due_date")
+            seen.extend(task.id for task in page)
+            if cursor is None:
+                break
+        assert seen == list(reversed(task_ids))
+
+    def test_get_users_page(self):
+        """Тест постраничной выборки пользователей"""
+        self.db_manager.add_user(User("second", "second@example.com", "manager"))
+
+        page, cursor = self.db_manager.get_users_page(page_size=1)
+        assert [user.username for user in page] == ["test_user"]
+        page, cursor = self.db_manager.get_users_page(page_size=1, cursor=cursor)
+        assert [user.username for user in page] == ["second"]
+        assert cursor is None
+
+    def test_page_cursor_validation(self):
+        """Тест отклонения чужого или испорченного курсора"""
+        for i in range(3):
+            self.add_task()
+        _, cursor = self.db_manager.get_tasks_page(page_size=1)
+
+        with pytest.raises(ValueError):
+            self.db_manager.get_tasks_page(cursor=cursor, order_by="due_date")
+        with pytest.raises(ValueError):
+            self.db_manager.get_tasks_page(cursor="not-a-cursor")
+
+    def test_due_date_page_uses_index(self):
+        """Тест использования индекса при выборке страницы по сроку"""
+        plan = self.query_plan(
+            "SELECT * FROM tasks WHERE (due_date, id) > (?, ?) ORDER BY due_date, id LIMIT 10",
+            ("2024", 1))
+        assert "idx_tasks_due_date" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_get_tasks_window_sorted_in_sql(self):
+        """Тест окна задач со смещением и сортировкой по столбцу"""
+        ids = [self.add_task(title=f"Задача {i}", priority=p) for i, p in enumerate((3, 1, 2, 1))]
+
+        assert self.db_manager.count_tasks() == 4
+        window = self.db_manager.get_tasks_window(1, 2, order_by="priority")
+        assert [task.id for task in window] == [ids[3], ids[2]]
+        window = self.db_manager.get_tasks_window(0, 10, order_by="priority", descending=True)
+        assert [task.id for task in window] == [ids[0], ids[2], ids[3], ids[1]]
+        with pytest.raises(ValueError):
+            self.db_manager.get_tasks_window(0, 10, order_by="description; DROP TABLE tasks")
+
+    def test_tasks_window_orders_use_indexes(self):
+        """Тест того, что окна в любом порядке читаются по индексу без сортировки таблицы"""
+        for column in TASK_SORT_COLUMNS:
+            plan = self.query_plan(
+                f"SELECT * FROM tasks ORDER BY {column} DESC, id DESC LIMIT 100 OFFSET 500")
+            # Досортировка по id внутри равных значений (RIGHT PART) допустима
+            assert "USE TEMP B-TREE FOR ORDER BY" not in plan, column
+
+    # === Потоковые итераторы ===
+
+    def test_iter_tasks_is_lazy(self):
+        """Тест ленивой выборки задач порциями"""
+        task_ids = [self.add_task(f"Задача {i}") for i in range(5)]
+
+        iterator = self.db_manager.iter_tasks(batch_size=2)
+        assert self.db_manager.pool.stats()["shared_checked_out"] == 0
+        first = next(iterator)
+        assert first.id == task_ids[0]
+        # Соединение берётся только на время запроса порции
+        assert self.db_manager.pool.stats()["shared_checked_out"] == 0
+
+        late_id = self.add_task("Во время обхода")
+        assert [task.id for task in iterator] == task_ids[1:] + [late_id]
+
+    def test_open_iterators_do_not_exhaust_pool(self):
+        """Тест того, что недочитанные генераторы не держат соединения общего пула"""
+        for _ in range(3):
+            self.add_task()
+        pool_size = self.db_manager.pool.max_size
+        iterators = [self.db_manager.iter_tasks(batch_size=1) for _ in range(pool_size + 2)]
+        for iterator in iterators:
+            next(iterator)
+
+        assert self.db_manager.pool.stats()["shared_checked_out"] == 0
+        assert all(len(list(iterator)) == 2 for iterator in iterators)
+
+    def test_iter_tasks_by_project_releases_connection_on_close(self):
+        """Тест возврата соединения в пул при досрочном закрытии генератора"""
+        for _ in range(3):
+            self.add_task()
+        iterator = self.db_manager.iter_tasks_by_project(self.project_id, batch_size=1)
+        next(iterator)
+        iterator.close()
+
+        assert self.db_manager.pool.stats()["shared_checked_out"] == 0
+
+    # === Прогресс проектов ===
+
+    def test_get_task_completion_stats(self):
+        """Тест подсчёта завершённых задач по проектам одним запросом"""
+        done = self.add_task()
+        self.add_task()
+        self.db_manager.update_task(done, status="completed")
+
+        assert self.db_manager.get_task_completion_stats() == {self.project_id: (1, 2)}
+
+    # === Агрегаты ===
+
+    def test_count_tasks(self):
+        """Тест подсчёта задач без загрузки объектов"""
+        user2_id = self.db_manager.add_user(User("user2", "user2@example.com", "developer"))
+        first = self.add_task(priority=1)
+        self.add_task(priority=3)
+        self.add_task(priority=3, assignee_id=user2_id)
+        self.db_manager.update_task(first, status="completed")
+
+        assert self.db_manager.count_tasks_by_user(self.user_id) == 2
+        assert self.db_manager.count_tasks_by_project(self.project_id) == 3
+        assert self.db_manager.count_tasks_by_status() == {"completed": 1, "pending": 2}
+        assert self.db_manager.count_tasks_by_priority(assignee_id=self.user_id) == {1: 1, 3: 1}
+        assert self.db_manager.count_tasks_by_status(project_id=self.project_id + 100) == {}
+
+    # === Кэш сущностей ===
+
+    def use_cached_manager(self):
+        # Кэш строк выключен по умолчанию
+        self.db_manager.close()
+        self.db_manager = DatabaseManager(self.db_path, cache_size=16)
+
+    def test_get_task_by_id_is_cached(self):
+        """Тест повторного чтения задачи из кэша"""
+        self.use_cached_manager()
+        task_id = self.add_task("Кэшируемая")
+        self.db_manager.get_task_by_id(task_id)
+        # Прямое изменение в обход менеджера кэш не видит - значит, чтение не ходит в БД
+        with self.db_manager.get_connection() as conn:
+            conn.execute("UPDATE tasks SET title = 'Изменена напрямую' WHERE id = ?", (task_id,))
+
+        assert self.db_manager.get_task_by_id(task_id).title == "Кэшируемая"
+        assert self.db_manager.cache_stats()["tasks"]["hits"] == 1
+
+    def test_writes_invalidate_cache(self):
+        """Тест инвалидации кэша при изменении и удалении"""
+        self.use_cached_manager()
+        task_id = self.add_task("Старое")
+        self.db_manager.get_task_by_id(task_id)
+        self.db_manager.update_task(task_id, title="Новое")
+        assert self.db_manager.get_task_by_id(task_id).title == "Новое"
+
+        self.db_manager.update_tasks_by_ids([task_id], title="Пакетное")
+        assert self.db_manager.get_task_by_id(task_id).title == "Пакетное"
+
+        self.db_manager.get_user_by_id(self.user_id)
+        self.db_manager.update_user(self.user_id, username="renamed")
+        assert self.db_manager.get_user_by_id(self.user_id).username == "renamed"
+
+        self.db_manager.delete_task(task_id)
+        assert self.db_manager.get_task_by_id(task_id) is None
+
+    def test_cache_eviction_and_disable(self):
+        """Тест вытеснения при переполнении и отключения кэша"""
+        db = DatabaseManager(self.db_path, cache_size=1)
+        second = self.add_task()
+        db.get_task_by_id(second)
+        first = self.add_task()
+        db.get_task_by_id(first)
+        assert db.cache_stats()["tasks"]["evictions"] == 1
+        db.close()
+
+        db = DatabaseManager(self.db_path)
+        db.get_task_by_id(first)
+        db.get_task_by_id(first)
+        assert db.cache_stats()["tasks"]["hits"] == 0
+        assert db.cache_stats()["tasks"]["size"] == 0
+        db.close()
+
+    # === Маппинг строк ===
+
+    def test_mapped_rows_keep_all_fields(self):
+        """Тест, что статус задачи и дата регистрации пользователя читаются из БД"""
+        task_id = self.add_task()
+        self.db_manager.update_task(task_id, status="completed")
+        self.db_manager.task_cache.clear()
+
+        task = self.db_manager.get_task_by_id(task_id)
+        assert task.status == "completed"
+        assert isinstance(task.due_date, datetime)
+        tasks = self.db_manager.get_tasks_by_project(self.project_id)
+        assert [t.status for t in tasks] == ["completed"]
+
+        user = self.db_manager.get_user_by_id(self.user_id)
+        assert isinstance(user.registration_date, datetime)
+
+    # === Колоночный снимок ===
+
+    def test_task_frame_filters_and_counts(self):
+        """Тест фильтров и группировок TaskFrame"""
+        ids = [self.add_task(priority=p) for p in (1, 2, 2, 3)]
+        self.db_manager.update_task(ids[1], status="completed")
+
+        frame = self.db_manager.get_task_frame(use_numpy=False)
+        assert len(frame) == 4
+        assert frame.count_by("priority") == {1: 1, 2: 2, 3: 1}
+        assert frame.count_by("status") == {"pending": 3, "completed": 1}
+
+        mask = frame.filter(priority=[2, 3], status="pending")
+        assert frame.count(mask) == 2
+        assert frame.ids(mask) == [ids[2], ids[3]]
+        assert [task.id for task in frame.to_tasks(mask)] == [ids[2], ids[3]]
+
+    def test_task_frame_overdue_matches_query(self):
+        """Тест совпадения маски просрочки с get_overdue_tasks"""
+        for days in (-3, -1, 2):
+            self.add_task(days=days)
+        done = self.add_task(days=-2)
+        self.db_manager.update_task(done, status="completed")
+
+        frame = self.db_manager.get_task_frame(use_numpy=False)
+        expected = [task.id for task in self.db_manager.get_overdue_tasks()]
+        assert sorted(frame.ids(frame.overdue_mask())) == sorted(expected)
+        assert frame.count(frame.overdue_mask(project_id=self.project_id + 1)) == 0
+        assert frame.count(frame.filter(project_id="1")) == 0
+
+    def test_task_frame_overdue_keeps_fraction_of_second(self):
+        """Тест, что маска просрочки учитывает доли секунды, как и SQL"""
+        task = self.db_manager.get_task_by_id(self.add_task())
+        now = task.due_date + timedelta(microseconds=1)
+        frame = self.db_manager.get_task_frame(use_numpy=False)
+
+        for moment in (task.due_date, now):
+            expected = [t.id for t in self.db_manager.get_overdue_tasks(now=moment)]
+            assert frame.ids(frame.overdue_mask(now=moment)) == expected
+
+    # === Асинхронный интерфейс ===
+
+    def test_async_manager_and_controllers(self):
+        """Тест awaitable-методов, async-генераторов и асинхронных контроллеров"""
+        async def scenario():
+            async with AsyncDatabaseManager(self.db_path, max_workers=2) as db:
+                controller = AsyncTaskController(db)
+                task = await controller.add_task("Асинхронная", "", 1, datetime.now(),
+                                                 self.project_id, self.user_id)
+                loaded = await asyncio.gather(*(db.get_task_by_id(task.id) for _ in range(20)))
+                streamed = [t.id async for t in db.iter_tasks(batch_size=1)]
+                count = await AsyncProjectController(db).count_tasks_by_project(self.project_id)
+                return task, loaded, streamed, count
+
+        task, loaded, streamed, count = asyncio.run(scenario())
+        assert {t.title for t in loaded} == {"Асинхронная"}
+        assert streamed == [task.id]
+        assert count == 1
+
+    def test_async_cancel_interrupts_query(self):
+        """Тест прерывания выполняющегося запроса при отмене корутины"""
+        def slow_query(db):
+            return db.get_connection().execute(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) "
+                "SELECT COUNT(*) FROM n").fetchone()
+
+        async def scenario():
+            async with AsyncDatabaseManager(self.db_path, max_workers=1) as db:
+                call = asyncio.ensure_future(db.runner.run(slow_query, db.db))
+                await asyncio.sleep(0.2)
+                call.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await call
+                # Поток пула освобождается и выполняет следующие запросы
+                return await asyncio.wait_for(db.get_user_by_id(self.user_id), timeout=5)
+
+        assert asyncio.run(scenario()).username == "test_user"
+
+    def test_async_stream_cancel_interrupts_batch(self):
+        """Тест того, что отмена async-генератора прерывает запрос текущей порции"""
+        for _ in range(30):
+            self.add_task()
+        slow = threading.Event()
+        slow.set()
+
+        def slow_connection(on_connect):
+            def hook(conn):
+                on_connect(conn)
+                # Пока slow установлен, каждая операция VM ждёт 10 мс: порция идёт секунды
+                conn.set_progress_handler(lambda: slow.is_set() and time.sleep(0.01), 1)
+            return hook
+
+        async def scenario():
+            async with AsyncDatabaseManager(self.db_path, max_workers=1) as db:
+                db.db.pool.on_connect = slow_connection(db.db.pool.on_connect)
+                batch = asyncio.ensure_future(db.iter_tasks().__anext__())
+                await asyncio.sleep(0.3)
+                cancelled_at = time.monotonic()
+                batch.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await batch
+                slow.clear()
+                await asyncio.wait_for(db.get_user_by_id(self.user_id), timeout=5)
+                return time.monotonic() - cancelled_at
+
+        assert asyncio.run(scenario()) < 0.5
+
+    def test_async_bulk_load(self):
+        """Тест bulk_load как асинхронного контекстного менеджера"""
+        async def scenario():
+            async with AsyncDatabaseManager(self.db_path, max_workers=2) as db:
+                async with db.bulk_load() as loader:
+                    assert loader is db
+                    await db.add_task(Task("Загруженная", "", 1, datetime.now(),
+                                           self.project_id, self.user_id))
+                return await db.search_tasks("Загруженная")
+
+        assert [task.title for task in asyncio.run(scenario())] == ["Загруженная"]
+
+    # === Журнал изменений ===
+
+    def test_changes_since_and_entity_changes(self):
+        """Тест журнала изменений и выборки изменённых сущностей"""
+        seq = self.db_manager.last_change_seq()
+        first = self.add_task(title="Первая")
+        second = self.add_task(title="Вторая")
+        self.db_manager.update_task(first, title="Первая*")
+        self.db_manager.delete_task(second)
+
+        changes = self.db_manager.changes_since(seq)
+        assert [(c.entity, c.entity_id, c.op) for c in changes] == [
+            ("tasks", first, "insert"), ("tasks", second, "insert"),
+            ("tasks", first, "update"), ("tasks", second, "delete"),
+        ]
+        result = self.db_manager.get_entity_changes("tasks", seq)
+        assert [t.title for t in result.changed] == ["Первая*"]
+        assert result.deleted == [second]
+        assert result.seq == changes[-1].seq
+        assert self.db_manager.get_entity_changes("tasks", result.seq).changed == []
+
+    def test_change_log_compaction_and_truncation(self):
+        """Тест сжатия и усечения журнала"""
+        task_id = self.add_task()
+        for priority in (1, 2, 3):
+            self.db_manager.update_task(task_id, priority=priority)
+        last = self.db_manager.last_change_seq()
+
+        assert self.db_manager.compact_change_log() == 3
+        assert [c.op for c in self.db_manager.changes_since(0, entity="tasks")] == ["update"]
+
+        self.db_manager.truncate_change_log(last)
+        assert len(self.db_manager.changes_since(last - 1)) == 1
+        with pytest.raises(ChangeLogTruncated):
+            self.db_manager.changes_since(0)
+
+    # === Параллельные запросы только на чтение ===
+
+    def test_read_only_executor_runs_named_queries(self):
+        """Тест параллельных именованных запросов через соединения mode=ro"""
+        self.add_task(priority=1)
+        self.add_task(priority=3)
+        queries = {
+            "tasks": "SELECT COUNT(*) FROM tasks",
+            "high": ("SELECT COUNT(*) FROM tasks WHERE priority = ?", (1,)),
+        }
+        for processes in (False, True):
+            with self.db_manager.read_only_executor(max_workers=2, processes=processes) as executor:
+                assert executor.run_all(queries) == {"tasks": [(2,)], "high": [(1,)]}
+                with pytest.raises(sqlite3.Error):
+                    executor.run_all({"write": "DELETE FROM tasks"})
+
+    def test_task_stats_report_groups_chunks(self):
+        """Тест отчёта по исполнителям: id больше IN_CHUNK_SIZE, с executor и без"""
+        self.add_task(days=-1)
+        self.db_manager.update_task(self.add_task(), status="completed")
+        user_ids = [self.user_id, *range(self.user_id + 1, self.user_id + 600)]
+        expected = {"by_status": {"pending": 1, "completed": 1}, "total": 2, "overdue": 1}
+
+        with self.db_manager.read_only_executor(max_workers=2) as executor:
+            for report in (self.db_manager.get_task_stats_report("assignee_id", user_ids),
+                           self.db_manager.get_task_stats_report("assignee_id", user_ids,
+                                                                 executor)):
+                assert len(report) == 600
+                assert report[self.user_id] == expected
+                assert report[user_ids[-1]] == {"by_status": {}, "total": 0, "overdue": 0}
+
+    # === Массовая загрузка и синтетические данные ===
+
+    def test_bulk_load_restores_search_and_change_log(self):
+        """Тест того, что после bulk_load задачи находятся поиском и есть в журнале"""
+        seq = self.db_manager.last_change_seq()
+        with self.db_manager.bulk_load():
+            self.db_manager.add_tasks_bulk(
+                Task(f"bulk item {i}", "", 2, datetime.now(), self.project_id, self.user_id)
+                for i in range(10))
+
+        assert len(self.db_manager.search_tasks("bulk")) == 10
+        changes = self.db_manager.changes_since(seq)
+        assert [(c.entity, c.op) for c in changes] == [("tasks", "insert")] * 10
+        task_id = changes[0].entity_id
+        self.db_manager.update_task(task_id, title="renamed")
+        assert self.db_manager.search_tasks("renamed")[0].id == task_id
+        assert self.db_manager.changes_since(changes[-1].seq)[0].op == "update"
+
+    def test_change_log_opt_out_keeps_shared_triggers(self):
+        """Тест того, что change_log=False не выключает журнал для других экземпляров"""
+        seq = self.db_manager.last_change_seq()
+        other = DatabaseManager(self.db_path, change_log=False)
+        with other.bulk_load():
+            other.add_tasks_bulk(
+                Task("bulk", "", 2, datetime.now(), self.project_id, self.user_id)
+                for _ in range(2))
+        other.close()
+
+        task_id = self.add_task()
+        changes = self.db_manager.changes_since(seq)
+        assert [c.op for c in changes] == ["insert"] * 3
+        assert changes[-1].entity_id == task_id
+
+    def test_generate_data_is_seeded_and_skewed(self):
+        """Тест детерминированности и распределений генератора данных"""
+        now = datetime(2025, 6, 1, 12, 0)
+        query = "SELECT * FROM tasks ORDER BY id"
+        dumps = []
+        for name in ("first.db", "second.db"):
+            db = DatabaseManager(os.path.join(self.temp_dir.name, name))
+            try:
+                counts = generate_data(db, users=30, projects=10, tasks=3000, seed=7, now=now,
+                                       overdue_fraction=0.25)
+                with db.get_connection() as conn:
+                    dumps.append(conn.execute(query).fetchall())
+                by_status = db.count_tasks_by_status()
+                overdue = len(db.get_overdue_tasks(now=now))
+                roles = {user.role for user in db.get_all_users()}
+                per_project = sorted(db.count_tasks_by_project(project.id)
+                                     for project in db.get_all_projects())
+            finally:
+                db.close()
+        assert counts == {"users": 30, "projects": 10, "tasks": 3000}
+        assert dumps[0] == dumps[1]
+
+        assert set(by_status) == {"pending", "in_progress", "completed"}
+        assert roles >= {"manager", "developer"}
+        assert 0.2 < overdue / (by_status["pending"] + by_status["in_progress"]) < 0.3
+        assert per_project[-1] > 3 * per_project[len(per_project) // 2]
+
+    def test_generate_data_skips_failed_users(self):
+        """Тест того, что задачи не ссылаются на пользователей, которых не удалось вставить"""
+        # Следующий id - 3, поэтому первое имя генератора "user3" уже занято
+        self.db_manager.add_user(User("user3", "taken@example.com", "developer"))
+        counts = generate_data(self.db_manager, users=3, projects=2, tasks=50)
+
+        user_ids = {user.id for user in self.db_manager.get_all_users()}
+        assert counts["users"] == 2 and len(user_ids) == 4
+        assert sum(self.db_manager.count_tasks_by_user(user_id) for user_id in user_ids) == 50
+
+    # === Инструментирование запросов ===
+
+    def test_instrumentation_records_methods_and_slow_queries(self):
+        """Тест статистики по методам и журнала медленных запросов с планом"""
+        for _ in range(3):
+            self.add_task()
+        log_path = os.path.join(self.temp_dir.name, "slow.jsonl")
+        with QueryInstrumentation(self.db_manager, slow_query_ms=0,
+                                  slow_log_path=log_path) as instrumentation:
+            assert len(self.db_manager.get_tasks_by_project(self.project_id)) == 3
+            assert sum(1 for _ in self.db_manager.iter_tasks(batch_size=2)) == 3
+            self.db_manager.count_tasks()
+        snapshot = instrumentation.snapshot()
+
+        methods = snapshot["methods"]
+        assert methods["get_tasks_by_project"]["count"] == 1
+        assert methods["get_tasks_by_project"]["rows"] == 3
+        assert methods["get_tasks_by_project"]["statements"] == 1
+        assert methods["iter_tasks"]["rows"] == 3
+        assert methods["count_tasks"]["p99_ms"] >= methods["count_tasks"]["p50_ms"] > 0
+
+        slow = [e for e in snapshot["slow_queries"] if e["method"] == "get_tasks_by_project"]
+        assert "project_id = ?" in slow[0]["sql"]
+        assert any("idx_tasks_project_id" in line for line in slow[0]["plan"])
+        with open(log_path, encoding="utf-8") as f:
+            assert len(f.readlines()) == len(snapshot["slow_queries"])
+
+    def test_instrumentation_logs_params_only_on_request(self):
+        """Тест того, что значения параметров попадают в журналы только при capture_params"""
+        self.add_task(title="secret title")
+        for capture in (False, True):
+            with QueryInstrumentation(self.db_manager, slow_query_ms=0,
+                                      capture_params=capture) as instrumentation:
+                self.db_manager.search_tasks("secret")
+            snapshot = instrumentation.snapshot()
+            logged = [e["sql"] for e in snapshot["slow_queries"] + snapshot["recent"]]
+            assert any("secret" in sql for sql in logged) == capture
+
+    def test_instrumentation_disable_restores_manager(self):
+        """Тест того, что после disable не остаётся ни обёрток, ни трассировки"""
+        instrumentation = QueryInstrumentation(self.db_manager).enable()
+        self.db_manager.count_tasks()
+        instrumentation.disable()
+        recent = len(instrumentation.snapshot()["recent"])
+
+        assert "count_tasks" not in vars(self.db_manager)
+        self.db_manager.count_tasks()
+        self.db_manager.build_search_query("abc")
+        assert instrumentation.snapshot()["methods"]["count_tasks"]["count"] == 1
+        assert len(instrumentation.snapshot()["recent"]) == recent
+
+    def test_latency_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for ms in [0.3] * 90 + [7.0] * 9 + [20000.0]:
+            histogram.record(ms)
+        assert histogram.percentile(50) == 0.5
+        assert histogram.percentile(95) == 10
+        assert histogram.percentile(100) == 20000.0
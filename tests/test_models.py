@@ -0,0 +1,46 @@
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Добавляем путь к модулям проекта
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from models.task import Task
+from models.project import Project
+from models.user import User
+
+
+class TestModels:
+    """Тесты моделей со __slots__ и ленивыми датами"""
+
+    def test_models_have_no_instance_dict(self):
+        """Тест отсутствия __dict__ у экземпляров"""
+        task = Task("Задача", "Описание", 1, datetime.now(), 1, 1)
+        project = Project("Проект", "Описание", datetime.now(), datetime.now())
+        user = User("user", "user@example.com", "developer")
+
+        for obj in (task, project, user):
+            assert not hasattr(obj, "__dict__")
+            with pytest.raises(AttributeError):
+                obj.unknown_field = 1
+
+    def test_iso_string_is_decoded_on_access(self):
+        """Тест ленивого разбора даты из строки"""
+        due = datetime(2024, 5, 1, 12, 30)
+        task = Task("Задача", "Описание", 1, due.isoformat(), 1, 1, task_id=7)
+
+        assert task._due_date == due.isoformat()
+        assert task.due_date == due
+        assert task._due_date is task.due_date
+
+    def test_to_dict_unchanged(self):
+        """Тест совпадения to_dict для строки и datetime"""
+        start = datetime(2024, 1, 1)
+        end = start + timedelta(days=10)
+        from_strings = Project("Проект", "Описание", start.isoformat(), end.isoformat(),
+                               project_id=1)
+        from_datetimes = Project("Проект", "Описание", start, end, project_id=1)
+
+        assert from_strings.to_dict() == from_datetimes.to_dict()
+        assert from_strings.get_progress(start + timedelta(days=5)) == 50.0
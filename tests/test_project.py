@@ -1,6 +1,20 @@
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+import tempfile
+
+# Добавляем путь к модулям проекта
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from database.database_manager import DatabaseManager
 from models.task import Task
 from models.project import Project
 from models.user import User
+from controllers.project_controller import ProjectController
+from controllers.task_controller import TaskController
+
+
 class TestProjectController:
     """Тесты для ProjectController"""
 
@@ -141,3 +155,38 @@ class TestProjectController:
         assert isinstance(progress, float)
         assert 0 <= progress <= 100
 
+    def add_project_with_tasks(self, count, days=1):
+        """Проект с исполнителем и count задачами со сроком через days дней"""
+        project_id = self.db_manager.add_project(
+            Project("Проект с задачами", "", datetime.now(), datetime.now() + timedelta(days=30)))
+        user_id = self.db_manager.add_user(User("test", "test@example.com", "developer"))
+        due = datetime.now() + timedelta(days=days)
+        task_ids = [self.db_manager.add_task(Task("Задача", "", 2, due, project_id, user_id))
+                    for _ in range(count)]
+        return project_id, task_ids
+
+    def test_get_all_projects_with_progress(self):
+        """Тест пакетного расчёта прогресса проектов"""
+        empty_project = self.db_manager.add_project(
+            Project("Пустой проект", "", datetime.now() - timedelta(days=10),
+                    datetime.now() + timedelta(days=10)))
+        project_id, task_ids = self.add_project_with_tasks(4)
+        self.db_manager.update_tasks_by_ids(task_ids[:3], status="completed")
+
+        by_tasks = {project.id: progress for project, progress in
+                    self.controller.get_all_projects_with_progress(by="tasks")}
+        assert by_tasks == {project_id: 75.0, empty_project: 0.0}
+
+        by_time = {project.id: progress
+                   for project, progress in self.controller.get_all_projects_with_progress()}
+        assert by_time[empty_project] == pytest.approx(50.0, abs=5)
+
+    def test_projects_report(self):
+        """Тест отчёта по проектам"""
+        project_id, task_ids = self.add_project_with_tasks(2, days=-1)
+        self.db_manager.update_task(task_ids[1], status="completed")
+
+        report = self.controller.get_projects_report()
+        assert report[project_id] == {
+            "by_status": {"pending": 1, "completed": 1}, "total": 2, "overdue": 1
+        }
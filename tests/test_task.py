@@ -1,4 +1,5 @@
 import pytest
+import sqlite3
 import sys
 import os
 from datetime import datetime, timedelta
@@ -228,6 +229,90 @@ class TestTaskController:
         for task in tasks:
             assert task.assignee_id == self.user_id
 
+    def add_tasks(self, count):
+        now = datetime.now()
+        tasks = [self.controller.add_task(f"Задача {i}", "Описание", 2, now + timedelta(days=i + 1),
+                                          self.project_id, self.user_id) for i in range(count)]
+        return [task.id for task in tasks]
+
+    def test_add_tasks_bulk_reports_bad_rows(self):
+        """Тест того, что некорректный словарь не прерывает пакетную вставку"""
+        due = datetime.now() + timedelta(days=1)
+        rows = [dict(title=f"Задача {i}", description="", priority=2, due_date=due,
+                     project_id=self.project_id, assignee_id=self.user_id) for i in range(5)]
+        rows[1]["estimate"] = 3  # неизвестное поле
+        del rows[3]["due_date"]  # нет обязательного поля
+        result = self.controller.add_tasks_bulk(rows, chunk_size=2)
+
+        assert result.inserted == 3
+        assert [index for index, _ in result.errors] == [1, 3]
+        assert result.ids[1] is None and result.ids[3] is None
+        assert self.controller.get_task(result.ids[4]).title == "Задача 4"
+
+    def test_update_task_status_many(self):
+        """Тест пакетной смены статуса"""
+        task_ids = self.add_tasks(3)
+
+        changed = self.controller.update_task_status_many(task_ids[:2], "completed")
+        assert changed == 2
+        completed = self.controller.get_tasks_by_user(self.user_id, status="completed")
+        assert sorted(task.id for task in completed) == task_ids[:2]
+
+        with pytest.raises(ValueError):
+            self.controller.update_task_status_many(task_ids, "archived")
+
+    def test_reassign_tasks(self):
+        """Тест пакетного переназначения задач"""
+        user2_id = self.db_manager.add_user(User("user2", "user2@example.com", "developer"))
+        task_ids = self.add_tasks(3)
+
+        assert self.controller.reassign_tasks(task_ids, user2_id) == 3
+        assert len(self.controller.get_tasks_by_user(user2_id)) == 3
+
+        with pytest.raises(ValueError):
+            self.controller.reassign_tasks(task_ids, user2_id + 100)
+
+    def test_update_tasks_where(self):
+        """Тест обновления задач по условию"""
+        task_ids = self.add_tasks(3)
+        self.controller.update_task_status(task_ids[0], "in_progress")
+
+        changed = self.controller.update_tasks(
+            where={"project_id": self.project_id, "status": "pending"}, set={"priority": 1})
+        assert changed == 2
+        with pytest.raises(ValueError):
+            self.controller.update_tasks(where={}, set={"priority": 1})
+
+        due_dates = [self.controller.get_task(task_id).due_date for task_id in task_ids[1:]]
+        changed = self.controller.update_tasks(where={"due_date": due_dates},
+                                               set={"status": "completed"})
+        assert changed == 2
+
+        # Длинный список не упирается в лимит числа переменных запроса
+        self.db_manager.get_connection().setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 10)
+        changed = self.controller.update_tasks(where={"id": task_ids + list(range(1000, 1100))},
+                                               set={"priority": 3})
+        assert changed == 3
+
+    def test_live_search_cache_and_narrowing(self):
+        """Тест кэша live_search, сужения по предыдущему запросу и сброса при изменениях"""
+        now = datetime.now()
+        bug = self.controller.add_task("Исправить bug", "", 1, now, self.project_id, self.user_id)
+        bugs = self.controller.add_task("Разобрать bugs", "", 1, now, self.project_id,
+                                        self.user_id)
+
+        assert {t.id for t in self.controller.live_search("bug")} == {bug.id, bugs.id}
+        assert [t.id for t in self.controller.live_search("bugs")] == [bugs.id]
+        assert self.db_manager.cache_stats()["search"]["size"] == 2
+
+        hits = self.db_manager.cache_stats()["search"]["hits"]
+        assert [t.id for t in self.controller.live_search("bugs")] == [bugs.id]
+        assert self.db_manager.cache_stats()["search"]["hits"] == hits + 1
+
+        self.controller.update_task(bug.id, title="Исправить bugs")
+        assert self.db_manager.cache_stats()["search"]["size"] == 0
+        assert {t.id for t in self.controller.live_search("bugs")} == {bug.id, bugs.id}
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
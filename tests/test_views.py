@@ -0,0 +1,187 @@
+import sys
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+# Добавляем путь к модулям проекта
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from views.background_loader import BackgroundLoader
+from views.virtual_tree import ListSource
+from views.tree_sync import TreeSync
+
+
+class FakeWidget:
+    """Заменяет Tk-виджет: after() запоминает колбэки, run_pending() выполняет их"""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+
+    def run_pending(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < deadline:
+            callback = self.callbacks.pop(0)
+            callback()
+            time.sleep(0.01)
+
+
+class TestBackgroundLoader:
+    """Тесты фоновой загрузки данных для представлений"""
+
+    def setup_method(self):
+        self.widget = FakeWidget()
+        self.busy = []
+        self.loader = BackgroundLoader(self.widget, on_busy=self.busy.append)
+
+    def teardown_method(self):
+        self.loader.shutdown()
+
+    def test_result_delivered_through_after(self):
+        """Тест передачи результата в колбэк через опрос after"""
+        results = []
+        self.loader.submit("tasks", lambda: threading.get_ident(), results.append)
+        assert results == []
+
+        self.widget.run_pending()
+        assert results and results[0] != threading.get_ident()
+        assert self.busy == [True, False]
+        assert not self.loader.busy
+
+    def test_stale_request_is_dropped(self):
+        """Тест отбрасывания результата устаревшего запроса"""
+        release = threading.Event()
+        results = []
+        self.loader.submit("tasks", lambda: release.wait(5) and "old", results.append)
+        self.loader.submit("tasks", lambda: "new", results.append)
+        release.set()
+
+        self.widget.run_pending()
+        assert results == ["new"]
+
+    def test_error_goes_to_error_callback(self):
+        """Тест передачи исключения в on_error"""
+        errors = []
+        self.loader.submit("tasks", lambda: 1 / 0, print, errors.append)
+        self.widget.run_pending()
+        assert isinstance(errors[0], ZeroDivisionError)
+
+    def test_superseded_query_is_interrupted(self):
+        """Тест прерывания уже выполняющегося устаревшего запроса к БД"""
+        local = threading.local()
+
+        def connection():
+            if not hasattr(local, "conn"):
+                local.conn = sqlite3.connect(":memory:")
+            return local.conn
+
+        slow_sql = ("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) "
+                    "SELECT count(*) FROM n")
+        outcome = []
+        started = threading.Event()
+
+        def slow_query():
+            # Сигнал подаётся уже изнутри выполняющегося запроса
+            connection().set_progress_handler(started.set, 1000)
+            try:
+                return connection().execute(slow_sql).fetchone()
+            except sqlite3.OperationalError as e:
+                outcome.append(str(e))
+                raise
+
+        self.loader.shutdown()
+        self.loader = BackgroundLoader(self.widget, max_workers=1, connection=connection)
+        results = []
+        self.loader.submit("search", slow_query, results.append)
+        assert started.wait(5)
+        begin = time.monotonic()
+        self.loader.submit("search", lambda: "new", results.append)
+
+        self.widget.run_pending()
+        assert results == ["new"]
+        assert outcome == ["interrupted"]
+        assert time.monotonic() - begin < 2
+
+
+class TestListSource:
+    """Тесты источника строк виртуальной таблицы из готового списка"""
+
+    def test_fetch_keeps_order_until_sorted(self):
+        items = [SimpleNamespace(id=i, priority=p) for i, p in ((1, 3), (2, 1), (3, 2))]
+        source = ListSource(items)
+
+        assert source.count() == 3
+        assert [item.id for item in source.fetch(0, 2)] == [1, 2]
+        assert [item.id for item in source.fetch(1, 5, "priority")] == [3, 1]
+        assert [item.id for item in source.fetch(0, 3, "priority", descending=True)] == [1, 3, 2]
+
+
+class FakeTree:
+    """Минимальная модель ttk.Treeview верхнего уровня со счётчиком вызовов"""
+
+    def __init__(self):
+        self.children = []
+        self.values = {}
+        self.calls = 0
+
+    def get_children(self):
+        return tuple(self.children)
+
+    def delete(self, *iids):
+        self.calls += 1
+        for iid in iids:
+            self.children.remove(iid)
+            del self.values[iid]
+
+    def insert(self, parent, index, iid, values):
+        self.calls += 1
+        self.children.insert(index, iid)
+        self.values[iid] = values
+
+    def move(self, iid, parent, index):
+        self.calls += 1
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+
+    def item(self, iid, values):
+        self.calls += 1
+        self.values[iid] = values
+
+
+class TestTreeSync:
+    """Тесты инкрементального обновления строк таблицы"""
+
+    def setup_method(self):
+        self.tree = FakeTree()
+        self.sync = TreeSync(self.tree, lambda item: (item.id, item.title))
+        self.items = [SimpleNamespace(id=i, title=f"Задача {i}") for i in range(1, 101)]
+        self.sync.apply(self.items)
+        self.tree.calls = 0
+
+    def test_unchanged_refresh_makes_no_calls(self):
+        stats = self.sync.apply(self.items)
+        assert stats == {"inserted": 0, "updated": 0, "moved": 0, "removed": 0}
+        assert self.tree.calls == 0
+
+    def test_single_changes_cost_single_calls(self):
+        """Тест, что правка, вставка, удаление и перенос стоят по одному вызову Tk"""
+        items = list(self.items)
+        items[10] = SimpleNamespace(id=11, title="Изменена")
+        items.insert(0, SimpleNamespace(id=500, title="Новая"))
+        items.remove(self.items[50])
+        items.append(items.pop(1))
+
+        stats = self.sync.apply(items)
+        assert stats == {"inserted": 1, "updated": 1, "moved": 1, "removed": 1}
+        assert self.tree.calls == 4
+        assert self.tree.children == [str(item.id) for item in items]
+        assert self.tree.values["11"] == (11, "Изменена")
+
+    def test_reordering_matches_new_order(self):
+        items = list(reversed(self.items))
+        self.sync.apply(items)
+        assert self.tree.children == [str(item.id) for item in items]
@@ -0,0 +1,135 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Как часто главный поток забирает готовые результаты, мс
+POLL_INTERVAL_MS = 30
+
+
+class BackgroundLoader:
+    """Выполняет загрузку данных для представлений в фоновых потоках.
+
+    Запросы именуются ключом (например, "tasks"): новый запрос с тем же ключом
+    делает предыдущий устаревшим - если он ещё в очереди, он отменяется, а если уже
+    выполняется, его результат отбрасывается. Если передан connection - функция,
+    возвращающая соединение БД текущего потока (например, db.get_connection), -
+    выполняющемуся устаревшему запросу отправляется interrupt(). Готовые результаты
+    передаются в главный поток Tk через очередь, которую опрашивает widget.after, и
+    только там вызываются колбэки. on_busy(busy) вызывается, когда появляются или заканчиваются
+    незавершённые запросы, - по нему показывается индикатор загрузки.
+    """
+
+    def __init__(self, widget, max_workers: int = 2, on_busy=None,
+                 poll_interval: int = POLL_INTERVAL_MS, connection=None):
+        self.widget = widget
+        self.on_busy = on_busy
+        self.connection = connection
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="view-loader")
+        self._results = queue.Queue()
+        self._pending = {}  # ключ -> (номер запроса, future, on_done, on_error)
+        self._counter = 0
+        self._polling = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._running = {}  # номер запроса -> соединение потока, который его выполняет
+        self._cancelled = set()
+
+    def submit(self, key: str, func, on_done, on_error=None):
+        """Запускает func() в фоне; on_done(result) или on_error(exc) вызываются в потоке Tk."""
+        if self._closed:
+            return
+        self._counter += 1
+        token = self._counter
+        previous = self._pending.pop(key, None)
+        if previous is not None:
+            self._stop(previous)
+
+        future = self._executor.submit(self._run, key, token, func)
+        self._pending[key] = (token, future, on_done, on_error)
+        self._set_busy()
+        self._schedule_poll()
+
+    def cancel(self, key: str):
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            self._stop(pending)
+            self._set_busy()
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+    def shutdown(self):
+        self._closed = True
+        for key in list(self._pending):
+            self.cancel(key)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _stop(self, pending):
+        token, future = pending[0], pending[1]
+        if future.cancel() or self.connection is None:
+            return
+        with self._lock:
+            conn = self._running.get(token)
+            if conn is not None:
+                # Под блокировкой: поток не успеет снять запись и начать следующий запрос
+                conn.interrupt()
+            elif not future.done():
+                # Поток уже взял запрос, но ещё не зарегистрировал соединение
+                self._cancelled.add(token)
+                future.add_done_callback(lambda _: self._forget_cancelled(token))
+
+    def _forget_cancelled(self, token: int):
+        with self._lock:
+            self._cancelled.discard(token)
+
+    def _run(self, key: str, token: int, func):
+        if self.connection is not None:
+            conn = self.connection()
+            with self._lock:
+                if token in self._cancelled:
+                    return  # запрос устарел до начала выполнения
+                self._running[token] = conn
+        try:
+            self._results.put((key, token, func(), None))
+        except Exception as e:
+            self._results.put((key, token, None, e))
+        finally:
+            with self._lock:
+                self._running.pop(token, None)
+
+    def _schedule_poll(self):
+        if not self._polling and not self._closed:
+            self._polling = True
+            self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                key, token, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(key, token, result, error)
+        if self._pending:
+            self._schedule_poll()
+
+    def _deliver(self, key: str, token: int, result, error):
+        pending = self._pending.get(key)
+        if pending is None or pending[0] != token:
+            return  # результат устаревшего или отменённого запроса
+        del self._pending[key]
+        self._set_busy()
+        _, _, on_done, on_error = pending
+        if error is None:
+            on_done(result)
+        elif on_error is not None:
+            on_error(error)
+        else:
+            raise error
+
+    def _set_busy(self):
+        if self.on_busy is not None:
+            self.on_busy(self.busy)
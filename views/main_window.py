@@ -30,5 +30,13 @@ class MainWindow:
         notebook.add(user_frame, text="Пользователи")
         self.user_view = UserView(user_frame, user_controller)
 
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        # Фоновые загрузки больше не нужны: их результаты некуда показывать
+        for view in (self.task_view, self.project_view, self.user_view):
+            view.loader.shutdown()
+        self.root.destroy()
+
     def run(self):
         self.root.mainloop()
\ No newline at end of file
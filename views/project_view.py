@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+from views.background_loader import BackgroundLoader
+from views.tree_sync import TreeSync
 
 
 class ProjectView:
@@ -47,12 +49,17 @@ class ProjectView:
         scrollbar.pack(side="right", fill="y")
 
         self.tree.bind("<<TreeviewSelect>>", self.on_project_select)
+        self.sync = TreeSync(self.tree, self.project_values, key=lambda row: row[0].id)
 
         btn_frame = ttk.Frame(self.frame)
         btn_frame.pack(fill="x", pady=5)
         ttk.Button(btn_frame, text="Обновить", command=self.load_projects).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Удалить", command=self.delete_selected_project).pack(side="left", padx=5)
+        self.loading_label = ttk.Label(btn_frame, text="")
+        self.loading_label.pack(side="left", padx=5)
 
+        self.loader = BackgroundLoader(self.frame, on_busy=self.show_loading,
+                                       connection=self.controller.db.get_connection)
         self.load_projects()
 
     def parse_date(self, date_str):
@@ -86,20 +93,30 @@ class ProjectView:
         self.start_var.set("")
         self.end_var.set("")
 
+    def show_loading(self, busy):
+        self.loading_label.config(text="Загрузка..." if busy else "")
+
+    def show_error(self, error):
+        messagebox.showerror("Ошибка", str(error))
+
     def load_projects(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        projects = self.controller.get_all_projects()
-        for proj in projects:
-            progress = self.controller.get_project_progress(proj.id)
-            self.tree.insert("", "end", values=(
-                proj.id,
-                proj.name,
-                proj.status,
-                f"{progress:.1f}",
-                proj.start_date.strftime("%Y-%m-%d"),
-                proj.end_date.strftime("%Y-%m-%d")
-            ))
+        self.loader.submit("projects", self.controller.get_all_projects_with_progress,
+                           self.show_projects, self.show_error)
+
+    def show_projects(self, projects):
+        self.sync.apply(projects)
+
+    @staticmethod
+    def project_values(row):
+        proj, progress = row
+        return (
+            proj.id,
+            proj.name,
+            proj.status,
+            f"{progress:.1f}",
+            proj.start_date.strftime("%Y-%m-%d"),
+            proj.end_date.strftime("%Y-%m-%d")
+        )
 
     def on_project_select(self, event):
         selected = self.tree.selection()
@@ -107,9 +124,11 @@ class ProjectView:
             return
         project_id = self.tree.item(selected[0])["values"][0]
         # Здесь можно открыть окно с задачами проекта (упрощённо — просто сообщение)
-        tasks = self.controller.task_controller.get_tasks_by_project(project_id) \
-            if hasattr(self.controller, 'task_controller') else []
-        messagebox.showinfo("Задачи проекта", f"Проект {project_id} имеет {len(tasks)} задач(и)")
+        self.loader.submit(
+            "project_tasks", lambda: self.controller.count_tasks_by_project(project_id),
+            lambda count: messagebox.showinfo("Задачи проекта",
+                                              f"Проект {project_id} имеет {count} задач(и)"),
+            self.show_error)
 
     def delete_selected_project(self):
         selected = self.tree.selection()
@@ -1,6 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+from views.background_loader import BackgroundLoader
+from views.virtual_tree import VirtualTreeview, QuerySource, ListSource
+
+# Поиск запускается, когда пользователь не печатает столько миллисекунд
+SEARCH_DELAY_MS = 250
 
 
 class TaskView:
@@ -46,28 +51,34 @@ class TaskView:
         self.search_var = tk.StringVar()
         ttk.Entry(search_frame, textvariable=self.search_var, width=30).pack(side="left", padx=5)
         ttk.Button(search_frame, text="Поиск", command=self.search_tasks).pack(side="left", padx=5)
+        # Поиск по мере ввода: каждое нажатие откладывает запрос на SEARCH_DELAY_MS
+        self._search_after_id = None
+        self.search_var.trace_add("write", self.on_search_changed)
+
+        # Запросы к БД выполняются в фоне, окно не замирает на больших базах
+        self.loader = BackgroundLoader(self.frame, on_busy=self.show_loading,
+                                       connection=self.controller.db.get_connection)
 
         # === Таблица задач ===
         table_frame = ttk.Frame(self.frame)
         table_frame.pack(fill="both", expand=True, pady=5)
 
+        # Виртуальная таблица: в Treeview только видимые строки, остальные читаются из БД
+        # окнами при прокрутке, сортировка по заголовку выполняется в SQL
         columns = ("ID", "Название", "Приоритет", "Статус", "Срок", "Проект", "Исполнитель")
-        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings")
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100)
-
-        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-
-        self.tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        fields = ("id", "title", "priority", "status", "due_date", "project_id", "assignee_id")
+        self.table = VirtualTreeview(table_frame, columns, fields, self.task_values, self.loader,
+                                     name="tasks", on_error=self.show_error)
+        self.tree = self.table.tree
+        self.all_tasks = QuerySource(self.controller.count_tasks, self.controller.get_tasks_window)
 
         # Кнопки управления
         btn_frame = ttk.Frame(self.frame)
         btn_frame.pack(fill="x", pady=5)
         ttk.Button(btn_frame, text="Обновить", command=self.load_tasks).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Удалить выбранное", command=self.delete_selected_task).pack(side="left", padx=5)
+        self.loading_label = ttk.Label(btn_frame, text="")
+        self.loading_label.pack(side="left", padx=5)
 
         self.load_tasks()
 
@@ -105,39 +116,48 @@ class TaskView:
         self.project_id_var.set(1)
         self.assignee_id_var.set(1)
 
+    def show_loading(self, busy):
+        self.loading_label.config(text="Загрузка..." if busy else "")
+
+    def show_error(self, error):
+        messagebox.showerror("Ошибка", str(error))
+
     def load_tasks(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        tasks = self.controller.get_all_tasks()
-        for task in tasks:
-            self.tree.insert("", "end", values=(
-                task.id,
-                task.title,
-                task.priority,
-                task.status,
-                task.due_date.strftime("%Y-%m-%d"),
-                task.project_id,
-                task.assignee_id
-            ))
+        self.loader.cancel("search")
+        self.table.set_source(self.all_tasks)
+
+    def on_search_changed(self, *args):
+        if self._search_after_id is not None:
+            self.frame.after_cancel(self._search_after_id)
+        self._search_after_id = self.frame.after(SEARCH_DELAY_MS, self.search_tasks)
 
     def search_tasks(self):
+        if self._search_after_id is not None:
+            self.frame.after_cancel(self._search_after_id)
+            self._search_after_id = None
         query = self.search_var.get()
         if not query:
             self.load_tasks()
             return
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        tasks = self.controller.search_tasks(query)
-        for task in tasks:
-            self.tree.insert("", "end", values=(
-                task.id,
-                task.title,
-                task.priority,
-                task.status,
-                task.due_date.strftime("%Y-%m-%d"),
-                task.project_id,
-                task.assignee_id
-            ))
+        # Новый запрос с тем же ключом отменяет ещё не начатый и прерывает уже
+        # выполняющийся, так что на экран попадает только последний ввод
+        self.loader.submit("search", lambda: self.controller.live_search(query),
+                           self.show_tasks, self.show_error)
+
+    def show_tasks(self, tasks):
+        self.table.set_source(ListSource(tasks))
+
+    @staticmethod
+    def task_values(task):
+        return (
+            task.id,
+            task.title,
+            task.priority,
+            task.status,
+            task.due_date.strftime("%Y-%m-%d"),
+            task.project_id,
+            task.assignee_id
+        )
 
     def delete_selected_task(self):
         selected = self.tree.selection()
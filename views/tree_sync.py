@@ -0,0 +1,83 @@
+from bisect import bisect_left
+
+
+class TreeSync:
+    """Обновляет строки ttk.Treeview по новому списку, меняя только то, что изменилось.
+
+    Строки сопоставляются по ключу (iid = str(key(item))): пропавшие удаляются, новые
+    вставляются, у изменившихся обновляются значения. Строки, которые уже стоят в нужном
+    относительном порядке (наибольшая возрастающая подпоследовательность), остаются на
+    месте, переносятся только остальные. Выделение и положение прокрутки при этом
+    сохраняются, а число вызовов Tk пропорционально числу изменений.
+    """
+
+    def __init__(self, tree, to_values, key=lambda item: item.id):
+        self.tree = tree
+        self.to_values = to_values
+        self.key = key
+        self._values = {}  # iid -> значения, показанные в строке
+
+    def apply(self, items) -> dict:
+        """Приводит таблицу к items и возвращает число вставок, обновлений, переносов и удалений."""
+        rows = [(str(self.key(item)), tuple(self.to_values(item))) for item in items]
+        stats = {'inserted': 0, 'updated': 0, 'moved': 0, 'removed': 0}
+
+        order = self._remove_missing({iid for iid, _ in rows}, stats)
+        positions = {iid: index for index, iid in enumerate(order)}
+        in_place = _increasing_subsequence(
+            [(positions[iid], iid) for iid, _ in rows if iid in positions])
+
+        previous = None
+        for iid, values in rows:
+            if iid not in positions:
+                index = order.index(previous) + 1 if previous is not None else 0
+                self.tree.insert("", index, iid=iid, values=values)
+                order.insert(index, iid)
+                stats['inserted'] += 1
+            else:
+                if iid not in in_place:
+                    # Индекс в move считается в списке детей без самой строки
+                    order.remove(iid)
+                    index = order.index(previous) + 1 if previous is not None else 0
+                    self.tree.move(iid, "", index)
+                    order.insert(index, iid)
+                    stats['moved'] += 1
+                if self._values[iid] != values:
+                    self.tree.item(iid, values=values)
+                    stats['updated'] += 1
+            self._values[iid] = values
+            previous = iid
+        return stats
+
+    def _remove_missing(self, wanted: set, stats: dict) -> list:
+        order = list(self.tree.get_children())
+        removed = [iid for iid in order if iid not in wanted or iid not in self._values]
+        if not removed:
+            return order
+        self.tree.delete(*removed)
+        for iid in removed:
+            self._values.pop(iid, None)
+        stats['removed'] = len(removed)
+        removed = set(removed)
+        return [iid for iid in order if iid not in removed]
+
+
+def _increasing_subsequence(pairs: list) -> set:
+    """Ключи наибольшей возрастающей по позиции подпоследовательности пар (позиция, ключ)."""
+    tails, tail_indexes, parents = [], [], [None] * len(pairs)
+    for i, (position, _) in enumerate(pairs):
+        slot = bisect_left(tails, position)
+        if slot == len(tails):
+            tails.append(position)
+            tail_indexes.append(i)
+        else:
+            tails[slot] = position
+            tail_indexes[slot] = i
+        parents[i] = tail_indexes[slot - 1] if slot > 0 else None
+
+    result = set()
+    i = tail_indexes[-1] if tail_indexes else None
+    while i is not None:
+        result.add(pairs[i][1])
+        i = parents[i]
+    return result
@@ -1,5 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from views.background_loader import BackgroundLoader
+from views.tree_sync import TreeSync
 
 
 class UserView:
@@ -43,12 +45,17 @@ class UserView:
         scrollbar.pack(side="right", fill="y")
 
         self.tree.bind("<<TreeviewSelect>>", self.on_user_select)
+        self.sync = TreeSync(self.tree, self.user_values)
 
         btn_frame = ttk.Frame(self.frame)
         btn_frame.pack(fill="x", pady=5)
         ttk.Button(btn_frame, text="Обновить", command=self.load_users).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Удалить", command=self.delete_selected_user).pack(side="left", padx=5)
+        self.loading_label = ttk.Label(btn_frame, text="")
+        self.loading_label.pack(side="left", padx=5)
 
+        self.loader = BackgroundLoader(self.frame, on_busy=self.show_loading,
+                                       connection=self.controller.db.get_connection)
         self.load_users()
 
     def add_user(self):
@@ -69,26 +76,38 @@ class UserView:
         self.email_var.set("")
         self.role_var.set("developer")
 
+    def show_loading(self, busy):
+        self.loading_label.config(text="Загрузка..." if busy else "")
+
+    def show_error(self, error):
+        messagebox.showerror("Ошибка", str(error))
+
     def load_users(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        users = self.controller.get_all_users()
-        for user in users:
-            self.tree.insert("", "end", values=(
-                user.id,
-                user.username,
-                user.email,
-                user.role,
-                user.registration_date.strftime("%Y-%m-%d")
-            ))
+        self.loader.submit("users", self.controller.get_all_users, self.show_users, self.show_error)
+
+    def show_users(self, users):
+        self.sync.apply(users)
+
+    @staticmethod
+    def user_values(user):
+        return (
+            user.id,
+            user.username,
+            user.email,
+            user.role,
+            user.registration_date.strftime("%Y-%m-%d")
+        )
 
     def on_user_select(self, event):
         selected = self.tree.selection()
         if not selected:
             return
         user_id = self.tree.item(selected[0])["values"][0]
-        tasks = self.controller.get_user_tasks(user_id)
-        messagebox.showinfo("Задачи пользователя", f"Пользователь {user_id} имеет {len(tasks)} задач(и)")
+        self.loader.submit(
+            "user_tasks", lambda: self.controller.count_tasks_by_user(user_id),
+            lambda count: messagebox.showinfo("Задачи пользователя",
+                                              f"Пользователь {user_id} имеет {count} задач(и)"),
+            self.show_error)
 
     def delete_selected_user(self):
         selected = self.tree.selection()
@@ -0,0 +1,223 @@
+from collections import OrderedDict
+from tkinter import ttk
+from views.tree_sync import TreeSync
+
+# Строки подгружаются блоками такого размера; в памяти держится не больше MAX_CACHED_BLOCKS
+DEFAULT_BLOCK_SIZE = 100
+MAX_CACHED_BLOCKS = 20
+
+# Сколько строк сверх видимых подгружать заранее, чтобы прокрутка не ждала БД
+DEFAULT_BUFFER_ROWS = 50
+
+DEFAULT_ROW_HEIGHT = 20
+HEADER_HEIGHT = 25
+
+
+class QuerySource:
+    """Источник строк из БД: count() и fetch(offset, limit, order_by, descending).
+
+    order_by = None означает порядок по умолчанию default_order.
+    """
+
+    def __init__(self, count, fetch, default_order: str = 'id'):
+        self.count = count
+        self._fetch = fetch
+        self.default_order = default_order
+
+    def fetch(self, offset: int, limit: int, order_by: str = None, descending: bool = False):
+        return self._fetch(offset, limit, order_by or self.default_order, descending)
+
+
+class ListSource:
+    """Источник строк из готового списка объектов, сортировка - в памяти по атрибуту.
+
+    Без order_by строки отдаются в исходном порядке (например, по релевантности поиска).
+    """
+
+    def __init__(self, items):
+        self.items = list(items)
+        self._sorted = {}
+
+    def count(self) -> int:
+        return len(self.items)
+
+    def fetch(self, offset: int, limit: int, order_by: str = None,
+              descending: bool = False) -> list:
+        if order_by is None:
+            return self.items[offset:offset + limit]
+        key = (order_by, descending)
+        if key not in self._sorted:
+            self._sorted = {key: sorted(self.items, key=lambda item: getattr(item, order_by),
+                                        reverse=descending)}
+        return self._sorted[key][offset:offset + limit]
+
+
+class VirtualTreeview:
+    """Таблица ttk.Treeview, в которой созданы только видимые строки.
+
+    Общее число строк берётся из source.count(), а сами строки подгружаются блоками
+    через source.fetch в фоновом BackgroundLoader по мере прокрутки. Полоса прокрутки
+    управляется вручную и отражает положение окна во всём наборе. Щелчок по заголовку
+    сортирует по столбцу на стороне источника (для БД - ORDER BY).
+    """
+
+    def __init__(self, parent, columns, fields, to_values, loader, name: str = "table",
+                 on_error=None, block_size: int = DEFAULT_BLOCK_SIZE,
+                 buffer_rows: int = DEFAULT_BUFFER_ROWS):
+        self.fields = dict(zip(columns, fields))
+        self.to_values = to_values
+        self.loader = loader
+        self.on_error = on_error
+        self.name = name
+        self.block_size = block_size
+        self.buffer_rows = buffer_rows
+
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings")
+        for col in columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=100)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.sync = TreeSync(self.tree, to_values)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.yview("scroll", -1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.yview("scroll", 1, "units"))
+        self.tree.bind("<Prior>", lambda e: self.yview("scroll", -1, "pages"))
+        self.tree.bind("<Next>", lambda e: self.yview("scroll", 1, "pages"))
+
+        self.source = None
+        self.total = 0
+        self.offset = 0
+        self.visible_rows = 20
+        self.order_by = None
+        self.descending = False
+        self._blocks = OrderedDict()  # номер блока -> список строк
+        self._generation = 0
+
+    # === Источник данных ===
+
+    def set_source(self, source):
+        """Показывает строки нового источника; для того же источника - обновляет их."""
+        if source is not self.source:
+            self.source = source
+            self.offset = 0
+            self.order_by, self.descending = None, False
+        self.refresh()
+
+    def refresh(self):
+        """Перечитывает число строк и видимое окно, например после изменения данных."""
+        if self.source is None:
+            return
+        self._reset()
+        generation = self._generation
+        self.loader.submit(f"{self.name}.count", self.source.count,
+                           lambda total: self._on_count(generation, total), self.on_error)
+
+    def sort_by(self, column: str):
+        field = self.fields[column]
+        if field == self.order_by:
+            self.descending = not self.descending
+        else:
+            self.order_by, self.descending = field, False
+        self.offset = 0
+        self._reset()
+        self._request_window()
+
+    def _reset(self):
+        self._generation += 1
+        self._blocks.clear()
+
+    def _on_count(self, generation: int, total: int):
+        if generation != self._generation:
+            return
+        self.total = total
+        self._clamp_offset()
+        self._request_window()
+
+    # === Прокрутка ===
+
+    def yview(self, *args):
+        """Обработчик команд полосы прокрутки: moveto/scroll в терминах строк набора."""
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self._clamp_offset()
+        self._request_window()
+
+    def _on_wheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def _clamp_offset(self):
+        self.offset = max(0, min(self.offset, self.total - self.visible_rows))
+
+    def _on_resize(self, event):
+        style = ttk.Style(self.tree)
+        row_height = int(style.lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT)
+        visible_rows = max(1, (event.height - HEADER_HEIGHT) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self._clamp_offset()
+            self._request_window()
+
+    def _update_scrollbar(self):
+        if self.total <= 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.scrollbar.set(self.offset / self.total,
+                           min(1.0, (self.offset + self.visible_rows) / self.total))
+
+    # === Загрузка окна ===
+
+    def _request_window(self):
+        if self.source is None:
+            return
+        end = min(self.total, self.offset + self.visible_rows + self.buffer_rows)
+        wanted = range(self.offset // self.block_size, max(end - 1, 0) // self.block_size + 1)
+        missing = [block for block in wanted if block not in self._blocks]
+        if not missing or self.total == 0:
+            self._render()
+            return
+
+        generation, source = self._generation, self.source
+        order_by, descending = self.order_by, self.descending
+        first, last = missing[0], missing[-1]
+        self.loader.submit(
+            f"{self.name}.window",
+            lambda: source.fetch(first * self.block_size, (last - first + 1) * self.block_size,
+                                 order_by, descending),
+            lambda rows: self._on_rows(generation, first, last, rows), self.on_error)
+
+    def _on_rows(self, generation: int, first: int, last: int, rows: list):
+        if generation != self._generation:
+            return
+        for block in range(first, last + 1):
+            start = (block - first) * self.block_size
+            self._blocks[block] = rows[start:start + self.block_size]
+            self._blocks.move_to_end(block)
+        while len(self._blocks) > MAX_CACHED_BLOCKS:
+            self._blocks.popitem(last=False)
+        self._render()
+
+    def visible_items(self) -> list:
+        """Строки текущего окна из кэша блоков."""
+        items = []
+        end = min(self.total, self.offset + self.visible_rows)
+        block = self.offset // self.block_size
+        while self.offset + len(items) < end:
+            rows = self._blocks.get(block)
+            if rows is None:
+                break
+            skip = self.offset + len(items) - block * self.block_size
+            items.extend(rows[skip:skip + end - self.offset - len(items)])
+            block += 1
+        return items
+
+    def _render(self):
+        # При прокрутке на строку меняются только строка сверху и строка снизу
+        self.sync.apply(self.visible_items())
+        self._update_scrollbar()